@@ -0,0 +1,198 @@
+from PyQt5.QtWidgets import QPushButton, QSlider, QMenu
+from PyQt5.QtCore import Qt, QTimer, QRect
+from PyQt5.QtGui import QPainter, QPixmap
+
+from equalizer import PRESETS, MAX_GAIN, save_settings
+from skin_window import SkinWindow
+
+
+class SkinButton(QPushButton):
+    """四态皮肤图按钮：普通、悬停、按下；可勾选的按钮勾选后显示按下的图"""
+
+    def __init__(self, parent=None, checkable=False):
+        super().__init__(parent)
+        self.setCheckable(checkable)
+        self.setCursor(Qt.PointingHandCursor)
+        self.states = [QPixmap()] * 4
+
+    def set_states(self, states):
+        self.states = states
+        self.update()
+
+    def paintEvent(self, event):
+        if self.isDown() or self.isChecked():
+            pixmap = self.states[2]
+        elif self.underMouse():
+            pixmap = self.states[1]
+        else:
+            pixmap = self.states[0]
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, pixmap)
+
+
+class EqSlider(QSlider):
+    """竖直的增益滑块：中线以上为提升，以下为衰减"""
+
+    def __init__(self, parent=None):
+        super().__init__(Qt.Vertical, parent)
+        self.setRange(-MAX_GAIN, MAX_GAIN)
+        self.setValue(0)
+        self.thumb = QPixmap()
+        self.fill = QPixmap()
+
+    def set_images(self, thumb, fill):
+        self.thumb = thumb
+        self.fill = fill
+        self.update()
+
+    def handle_y(self):
+        available = self.height() - self.thumb.height()
+        return int(available * (self.maximum() - self.value()) / (self.maximum() - self.minimum()))
+
+    def mousePressEvent(self, event):
+        # 点在哪里滑块就到哪里，不按页跳动
+        if event.button() == Qt.LeftButton:
+            self.setSliderDown(True)
+            self._move_to(event.y())
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.isSliderDown():
+            self._move_to(event.y())
+
+    def mouseReleaseEvent(self, event):
+        if self.isSliderDown():
+            self.setSliderDown(False)
+        else:
+            super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        # 双击归零
+        self.setValue(0)
+
+    def _move_to(self, y):
+        available = max(self.height() - self.thumb.height(), 1)
+        ratio = min(max((y - self.thumb.height() / 2) / available, 0.0), 1.0)
+        self.setValue(round(self.maximum() - ratio * (self.maximum() - self.minimum())))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        top = self.handle_y()
+        middle = self.height() // 2
+        # 填充条从中线画到滑块中心
+        if not self.fill.isNull():
+            center = top + self.thumb.height() // 2
+            upper, lower = min(center, middle), max(center, middle)
+            if lower > upper:
+                x = (self.width() - self.fill.width()) // 2
+                # 填充图与滑块等高，只取对应的那一段
+                scale = self.fill.height() / max(self.height(), 1)
+                painter.drawPixmap(QRect(x, upper, self.fill.width(), lower - upper), self.fill,
+                                   QRect(0, int(upper * scale), self.fill.width(),
+                                         max(int((lower - upper) * scale), 1)))
+        painter.drawPixmap((self.width() - self.thumb.width()) // 2, top, self.thumb)
+
+
+class EqualizerWindow(SkinWindow):
+    """均衡器窗口：开关、预设、重置，前级增益和十个频段的滑块，布局取自 Skin.xml 的 equalizer_window"""
+
+    def __init__(self, equalizer, engine, skin, layout):
+        super().__init__()
+        self.equalizer = equalizer
+        self.engine = engine
+        self.skin = skin
+
+        self.enabled = SkinButton(self, checkable=True)
+        self.enabled.setChecked(engine.equalizer is not None)
+        self.enabled.setToolTip("启用均衡器")
+        self.enabled.toggled.connect(self.set_enabled)
+        self.profile = SkinButton(self)
+        self.profile.setToolTip("预设")
+        self.profile.clicked.connect(self.show_presets)
+        self.reset = SkinButton(self)
+        self.reset.setToolTip("重置")
+        self.reset.clicked.connect(self.reset_gains)
+        self.close_button = SkinButton(self)
+        self.close_button.clicked.connect(self.hide)
+
+        self.preamp = EqSlider(self)
+        self.preamp.setToolTip("前级增益")
+        self.preamp.setValue(round(equalizer.preamp))
+        self.preamp.valueChanged.connect(self.on_preamp)
+        self.bands = []
+        for band, freq in enumerate(equalizer.bands):
+            slider = EqSlider(self)
+            slider.setToolTip(f"{freq} Hz" if freq < 1000 else f"{freq // 1000} kHz")
+            slider.setValue(round(equalizer.gains[band]))
+            slider.valueChanged.connect(lambda value, b=band: self.on_gain(b, value))
+            self.bands.append(slider)
+
+        # 拖动滑块时不反复写文件，停下半秒后再保存
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(500)
+        self.save_timer.timeout.connect(self.save)
+        self.apply_skin(layout)
+
+    def apply_skin(self, layout):
+        self.skin.apply_background(self, layout, 'equalizer_window')
+
+        for button, element in ((self.enabled, 'enabled'), (self.profile, 'profile'),
+                                (self.reset, 'reset'), (self.close_button, 'close')):
+            image = layout.image('equalizer_window', element)
+            if not image:
+                continue
+            states = self.skin.states(image)
+            button.set_states(states)
+            rect = layout.place('equalizer_window', element, (states[0].width(), states[0].height()))
+            if rect:
+                button.setGeometry(*rect)
+
+        # 滑块：前级增益单独一个，各频段从 eqfactor 的位置起按 eq_interval 间隔排开
+        interval = int(layout.window('equalizer_window').get('eq_interval', 5) or 5)
+        for element, sliders in (('preamp', [self.preamp]), ('eqfactor', self.bands)):
+            attrs = layout.element('equalizer_window', element)
+            if not attrs or not attrs.get('rect'):
+                continue
+            thumb = self.skin.states(attrs['thumb_image'])[0] if attrs.get('thumb_image') else QPixmap()
+            fill = self.skin.image(attrs['fill_image']) if attrs.get('fill_image') else QPixmap()
+            x, y, width, height = attrs['rect']
+            for i, slider in enumerate(sliders):
+                slider.set_images(thumb, fill)
+                slider.setGeometry(x + i * (width + interval), y, width, height)
+
+    # ---- 操作 ----
+    def set_enabled(self, enabled):
+        self.engine.set_equalizer(self.equalizer if enabled else None)
+        self.save()
+
+    def on_gain(self, band, value):
+        self.equalizer.set_gain(band, value)
+        self.save_timer.start()
+
+    def on_preamp(self, value):
+        self.equalizer.set_preamp(value)
+        self.save_timer.start()
+
+    def show_presets(self):
+        menu = QMenu(self)
+        for name in PRESETS:
+            action = menu.addAction(name)
+            action.triggered.connect(lambda checked, n=name: self.load_preset(n))
+        menu.exec_(self.profile.mapToGlobal(self.profile.rect().bottomLeft()))
+
+    def load_preset(self, name):
+        for slider, gain in zip(self.bands, PRESETS[name]):
+            slider.setValue(gain)
+        # 选了预设通常就是想听效果，顺便打开均衡器
+        self.enabled.setChecked(True)
+
+    def reset_gains(self):
+        self.preamp.setValue(0)
+        for slider in self.bands:
+            slider.setValue(0)
+
+    def save(self):
+        self.save_timer.stop()
+        save_settings(self.equalizer, self.enabled.isChecked())
@@ -0,0 +1,147 @@
+import os
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# 支持导入的音频格式
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.m4a', '.ogg', '.wav', '.ape')
+# 每批交给界面的文件数
+BATCH_SIZE = 500
+
+
+def is_audio_file(path):
+    return path.lower().endswith(AUDIO_EXTENSIONS)
+
+
+def scan_audio_files(root, cancelled=None, recursive=True, folders=None):
+    """用 os.scandir 遍历目录，逐个产出音频文件路径；cancelled 被设置后立即停止。
+
+    传入 folders 列表时，把读到的每个目录（包括没有音频文件的）追加进去。
+    """
+    stack = [root]
+    while stack:
+        if cancelled is not None and cancelled.is_set():
+            return
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as entries:
+                subdirs = []
+                for entry in sorted(entries, key=lambda e: e.name):
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and is_audio_file(entry.name):
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"无法读取目录：{e}")
+            continue
+        if folders is not None:
+            folders.append(os.path.normpath(folder))
+        if recursive:
+            # 倒序压栈，保证按名称顺序遍历
+            stack.extend(reversed(subdirs))
+
+
+class ScanSignals(QObject):
+    batch = pyqtSignal(list)
+    folders = pyqtSignal(list)
+    done = pyqtSignal(object)
+
+
+class ScanTask(QRunnable):
+    """扫描一个目录；split 为 True 时只扫描顶层文件，每个子目录另开任务并行扫描"""
+
+    def __init__(self, importer, root, split=False):
+        super().__init__()
+        self.importer = importer
+        self.root = root
+        self.split = split
+        self.cancelled = importer.cancelled
+        self.signals = ScanSignals()
+
+    def run(self):
+        batch = []
+        folders = []
+        if self.split:
+            try:
+                with os.scandir(self.root) as entries:
+                    subdirs = sorted(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+            except OSError as e:
+                print(f"无法读取目录：{e}")
+                subdirs = []
+            for subdir in subdirs:
+                self.importer.submit(subdir)
+        for path in scan_audio_files(self.root, self.cancelled, recursive=not self.split, folders=folders):
+            batch.append(path)
+            if len(batch) >= BATCH_SIZE:
+                self.signals.batch.emit(batch)
+                batch = []
+        if batch and not self.cancelled.is_set():
+            self.signals.batch.emit(batch)
+        if folders and not self.cancelled.is_set():
+            self.signals.folders.emit(folders)
+        self.signals.done.emit(self)
+
+
+class LibraryImporter(QObject):
+    """后台递归导入文件夹，分批把找到的音频文件交回主线程"""
+
+    batchFound = pyqtSignal(list)
+    foldersScanned = pyqtSignal(list)  # 扫描过的目录
+    progress = pyqtSignal(int)  # 已找到的文件数
+    finished = pyqtSignal(int, bool)  # 找到的文件总数, 是否被取消
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self.cancelled = threading.Event()
+        self.found = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    def is_running(self):
+        with self._lock:
+            return self._pending > 0
+
+    def start(self, roots):
+        """开始导入若干个文件夹；已有导入在进行时并入同一批"""
+        if not self.is_running():
+            self.cancelled = threading.Event()
+            self.found = 0
+        for root in roots:
+            self.submit(root, split=True)
+
+    def submit(self, root, split=False):
+        # 可能在扫描线程中调用，计数需加锁
+        task = ScanTask(self, root, split)
+        task.signals.batch.connect(self._on_batch)
+        task.signals.folders.connect(self._on_folders)
+        task.signals.done.connect(self._on_done)
+        with self._lock:
+            self._pending += 1
+            self._tasks.add(task)
+        self.pool.start(task)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _on_batch(self, paths):
+        if self.cancelled.is_set():
+            return
+        self.found += len(paths)
+        self.batchFound.emit(paths)
+        self.progress.emit(self.found)
+
+    def _on_folders(self, folders):
+        if not self.cancelled.is_set():
+            self.foldersScanned.emit(folders)
+
+    def _on_done(self, task):
+        with self._lock:
+            self._tasks.discard(task)
+            self._pending -= 1
+            remaining = self._pending
+        if remaining == 0:
+            self.finished.emit(self.found, self.cancelled.is_set())
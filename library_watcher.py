@@ -0,0 +1,173 @@
+import os
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from library_import import is_audio_file
+
+
+def _norm(path):
+    return os.path.normcase(os.path.normpath(path))
+
+
+class LibraryWatcher(QObject):
+    """监视媒体库目录，目录变化后去抖动，只重新扫描发生变化的目录"""
+
+    filesAdded = pyqtSignal(list)
+    filesRemoved = pyqtSignal(list)
+    foldersAdded = pyqtSignal(list)  # 新出现的子目录，交给导入器递归扫描
+    foldersRemoved = pyqtSignal(list)  # 被删除或移走的目录
+
+    # 每次最多重新扫描的目录数，剩下的留到下一轮，避免界面卡顿
+    DIRS_PER_PASS = 50
+
+    def __init__(self, debounce=1000, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.mark_dirty)
+        self.roots = []
+        # 目录 -> {规范化路径: 播放列表中的原始路径}，只记录该目录本身（不含子目录）的文件
+        self.dirs = {}
+        self.watched = set()
+        self.missing = set()  # 要求监视时已经不存在的目录，下次 rescan_all 时作为已删除处理
+        self._dirty = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce)
+        self.timer.timeout.connect(self._process_dirty)
+
+    def add_roots(self, roots):
+        for root in roots:
+            root = os.path.normpath(root)
+            if root not in self.roots:
+                self.roots.append(root)
+                self._watch([root])
+
+    def remove_roots(self, roots):
+        """不再监视这些根目录（例如导入被取消），返回因此不再监视的目录"""
+        removed = [root for root in map(os.path.normpath, roots) if root in self.roots]
+        if not removed:
+            return []
+        for root in removed:
+            self.roots.remove(root)
+        folders = [folder for folder in self.watched if self.root_of(folder) is None]
+        self._unwatch(folders)
+        for folder in [folder for folder in self.dirs if self.root_of(folder) is None]:
+            del self.dirs[folder]
+        self._dirty = {folder for folder in self._dirty if self.root_of(folder) is not None}
+        self.missing = {folder for folder in self.missing if self.root_of(folder) is not None}
+        return folders
+
+    def root_of(self, path):
+        key = _norm(path)
+        for root in self.roots:
+            root_key = _norm(root)
+            if key == root_key or key.startswith(root_key.rstrip(os.sep) + os.sep):
+                return root
+        return None
+
+    def track(self, paths):
+        """记录媒体库根目录下的歌曲，并监视它们所在的目录及其上级目录"""
+        folders = set()
+        for path in paths:
+            root = self.root_of(path)
+            if root is None:
+                continue
+            folder = os.path.dirname(os.path.normpath(path))
+            self.dirs.setdefault(folder, {})[_norm(path)] = path
+            # 一直到根目录的每一级都要监视，才能发现新建的子目录
+            while folder not in folders and folder not in self.watched:
+                folders.add(folder)
+                if _norm(folder) == _norm(root):
+                    break
+                parent = os.path.dirname(folder)
+                if parent == folder:
+                    break
+                folder = parent
+        self._watch(folders)
+
+    def watch_folders(self, folders):
+        """监视媒体库根目录下的目录（包括没有歌曲的），之后重新扫描时它们不算新目录"""
+        self._watch([os.path.normpath(folder) for folder in folders if self.root_of(folder) is not None])
+
+    def forget(self, paths):
+        for path in paths:
+            files = self.dirs.get(os.path.dirname(os.path.normpath(path)))
+            if files is not None:
+                files.pop(_norm(path), None)
+
+    def rescan_all(self):
+        """把所有已监视的目录都重新核对一遍（例如程序关闭期间文件有变动）；
+        已经不存在的目录和歌曲所在目录也在其中，重新扫描时会发出删除信号"""
+        self._dirty.update(self.watched, self.dirs, self.missing)
+        self.missing.clear()
+        self.timer.start(0)
+
+    def mark_dirty(self, folder):
+        self._dirty.add(os.path.normpath(folder))
+        # 连续的变化只在最后一次之后扫描一次
+        self.timer.start()
+
+    def _watch(self, folders):
+        folders = [folder for folder in folders if folder not in self.watched]
+        self.missing.update(folder for folder in folders if not os.path.isdir(folder))
+        folders = [folder for folder in folders if folder not in self.missing]
+        if folders:
+            self.watcher.addPaths(folders)
+            self.watched.update(folders)
+
+    def _unwatch(self, folders):
+        folders = [folder for folder in folders if folder in self.watched]
+        if folders:
+            self.watcher.removePaths(folders)
+            self.watched.difference_update(folders)
+
+    def _process_dirty(self):
+        added, removed, new_folders, gone_folders = [], [], [], []
+        for _ in range(min(self.DIRS_PER_PASS, len(self._dirty))):
+            self._rescan_dir(self._dirty.pop(), added, removed, new_folders, gone_folders)
+        if removed:
+            self.forget(removed)
+            self.filesRemoved.emit(removed)
+        if added:
+            self.filesAdded.emit(added)
+        if new_folders:
+            self.foldersAdded.emit(new_folders)
+        if gone_folders:
+            self.foldersRemoved.emit(gone_folders)
+        if self._dirty:
+            self.timer.start(0)
+
+    def _rescan_dir(self, folder, added, removed, new_folders, gone_folders):
+        """只扫描这一层目录，与记录对比得出新增和删除的文件"""
+        known = self.dirs.get(folder, {})
+        try:
+            with os.scandir(folder) as entries:
+                on_disk = {}
+                subdirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(os.path.normpath(entry.path))
+                        elif entry.is_file() and is_audio_file(entry.name):
+                            on_disk[_norm(entry.path)] = entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            # 目录被删除或移走：它和所有子目录里的歌曲都移除
+            prefix = _norm(folder).rstrip(os.sep) + os.sep
+            gone = [d for d in self.dirs if _norm(d) == _norm(folder) or _norm(d).startswith(prefix)]
+            for d in gone:
+                removed.extend(self.dirs.pop(d).values())
+            gone = [d for d in self.watched if _norm(d) == _norm(folder) or _norm(d).startswith(prefix)]
+            self._unwatch(gone)
+            self.missing.discard(folder)
+            if folder not in gone:
+                gone.append(folder)
+            gone_folders.extend(gone)
+            return
+
+        removed.extend(path for key, path in known.items() if key not in on_disk)
+        added.extend(path for key, path in on_disk.items() if key not in known)
+        # 新出现的子目录：开始监视并递归导入
+        fresh = [subdir for subdir in subdirs if subdir not in self.watched]
+        self._watch(fresh)
+        new_folders.extend(fresh)
@@ -1,47 +1,11 @@
 import sys
 import re
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QLabel,
-                             QVBoxLayout, QWidget, QAction, QMenu,QGraphicsOpacityEffect)
-from PyQt5.QtCore import Qt, QTimer, QPoint,QPropertyAnimation,QEasingCurve
+from PyQt5.QtWidgets import (QApplication, QMainWindow,
+                             QVBoxLayout, QWidget, QAction, QMenu)
+from PyQt5.QtCore import Qt, QTimer, QPoint
 from PyQt5.QtGui import QFont, QCursor, QColor, QPalette
 
-class FadingLabel(QLabel):
-    """带淡入淡出动画的标签"""
-
-    def __init__(self, text="", parent=None):
-        super().__init__(text, parent)
-        self.setAlignment(Qt.AlignCenter)
-
-        # 设置字体样式
-        font = QFont()
-        font.setPointSize(18)
-        font.setBold(True)
-        self.setFont(font)
-
-        # 透明度效果和动画
-        self.effect = QGraphicsOpacityEffect(self)
-        self.setGraphicsEffect(self.effect)
-        self.animation = QPropertyAnimation(self.effect, b"opacity")
-        self.animation.setDuration(500)  # 动画持续时间
-        self.animation.setEasingCurve(QEasingCurve.InOutQuad)
-
-    def fade_in(self):
-        """淡入效果"""
-        self.animation.stop()
-        self.effect.setOpacity(0)
-        self.setVisible(True)
-        self.animation.setStartValue(0)
-        self.animation.setEndValue(1)
-        self.animation.start()
-
-    # def fade_out(self):
-    #     """淡出效果"""
-    #     self.animation.stop()
-    #     self.effect.setOpacity(1)
-    #     self.animation.setStartValue(1)
-    #     self.animation.setEndValue(0)
-    #     self.animation.finished.connect(lambda: self.setVisible(False))
-    #     self.animation.start()
+from lyric_render import FadingLabel
 
 class LyricWindow(QMainWindow):
     def __init__(self):
@@ -60,7 +24,7 @@ class LyricWindow(QMainWindow):
         # self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
 
         # 创建歌词显示标签
-        self.lyric_label = FadingLabel("")
+        self.lyric_label = FadingLabel("", duration=500)
         # 在 LyricWindow 的 init_ui 中，创建 lyric_label 后添加：
         self.lyric_label.setAttribute(Qt.WA_TransparentForMouseEvents)
         self.lyric_label.setAlignment(Qt.AlignCenter)
@@ -0,0 +1,197 @@
+from PyQt5.QtWidgets import QWidget, QPushButton
+from PyQt5.QtCore import Qt, QRect, QTimer, QEasingCurve, QVariantAnimation
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter
+from PyQt5.QtMultimedia import QMediaPlayer
+
+from lyrics import Lyrics
+from lyric_render import lyric_pixmaps
+from skin_loader import TEXT_FONT
+from skin_window import SkinWindow
+
+
+class LyricView(QWidget):
+    """多行滚动歌词：当前行高亮并居中，换行时平滑滚动。
+
+    只绘制落在可见区域内的几行，每行文字取自 lyric_pixmaps 缓存，
+    所以歌词再长、跳转再频繁，每次绘制的开销也只和可见行数有关。
+    """
+
+    LINE_SPACING = 6
+    SCROLL_TIME = 300  # 滚动一行的动画时长（毫秒）
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.lyrics = Lyrics()
+        self.index = -1
+        self.progress = 1.0  # 当前行已唱过的比例（逐字歌词）
+        # 默认颜色取自 skin/Purple/Lyric.xml，apply_skin 时按皮肤更新
+        self.text_color = QColor("#7578AB")
+        self.highlight_color = QColor("#E8E8E8")
+        self.lyric_font = QFont(TEXT_FONT)
+        self.lyric_font.setPixelSize(13)
+        self.line_height = QFontMetrics(self.lyric_font).height() + self.LINE_SPACING
+        self.offset = 0.0  # 视图中心对应的歌词位置（像素）
+        self.scroll = QVariantAnimation(self)
+        self.scroll.setDuration(self.SCROLL_TIME)
+        self.scroll.setEasingCurve(QEasingCurve.OutCubic)
+        self.scroll.valueChanged.connect(self._set_offset)
+
+    def apply_skin(self, layout):
+        self.text_color = QColor(layout.color('lyric', 'TextColor', self.text_color.name()))
+        self.highlight_color = QColor(layout.color('lyric', 'HilightColor', self.highlight_color.name()))
+        font = layout.font('lyric')
+        if font:
+            self.lyric_font.setPixelSize(max(font[1], 12))
+        self.line_height = QFontMetrics(self.lyric_font).height() + self.LINE_SPACING
+        self.offset = max(self.index, 0) * self.line_height
+        self.update()
+
+    def set_lyrics(self, lyrics):
+        self.scroll.stop()
+        self.lyrics = lyrics
+        self.index = -1
+        self.progress = 1.0
+        self.offset = 0.0
+        self.update()
+
+    def set_current(self, index):
+        """切换当前行：相邻几行之间平滑滚动，跳转较远（拖动进度条）时直接定位"""
+        if index == self.index:
+            return
+        self.index = index
+        self.progress = 1.0 if index < 0 or not self.lyrics.words[index] else 0.0
+        target = float(max(index, 0) * self.line_height)
+        self.scroll.stop()
+        if abs(target - self.offset) <= self.height() / 2 and self.isVisible():
+            self.scroll.setStartValue(self.offset)
+            self.scroll.setEndValue(target)
+            self.scroll.start()
+        else:
+            self.offset = target
+        self.update()
+
+    def set_progress(self, progress):
+        """逐字高亮：只刷新当前行"""
+        if abs(progress - self.progress) < 0.005:
+            return
+        self.progress = progress
+        self.update(self.line_rect(self.index))
+
+    def line_rect(self, index):
+        top = int(self.height() / 2 + index * self.line_height - self.offset - self.line_height / 2)
+        return QRect(0, top, self.width(), self.line_height)
+
+    def _set_offset(self, value):
+        self.offset = value
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        texts = self.lyrics.texts
+        if not texts:
+            painter.setFont(self.lyric_font)
+            painter.setPen(self.text_color)
+            painter.drawText(self.rect(), Qt.AlignCenter, "暂无歌词")
+            return
+        # 只画与刷新区域相交的行
+        area = event.rect()
+        half = self.height() / 2
+        first = max(int((self.offset + area.top() - half) // self.line_height), 0)
+        last = min(int((self.offset + area.bottom() - half) // self.line_height) + 2, len(texts))
+        ratio = self.devicePixelRatioF()
+        for index in range(first, last):
+            text = texts[index]
+            if not text:
+                continue
+            rect = self.line_rect(index)
+            current = index == self.index
+            pixmap = lyric_pixmaps.get(text, self.lyric_font,
+                                       self.highlight_color if current and self.progress >= 1 else self.text_color,
+                                       ratio)
+            width = int(pixmap.width() / ratio)
+            height = int(pixmap.height() / ratio)
+            x = (self.width() - width) // 2
+            y = rect.top() + (rect.height() - height) // 2
+            painter.drawPixmap(x, y, pixmap)
+            if current and 0 < self.progress < 1:
+                # 已唱过的部分用高亮色覆盖
+                done = lyric_pixmaps.get(text, self.lyric_font, self.highlight_color, ratio)
+                sung = int(width * self.progress)
+                painter.drawPixmap(QRect(x, y, sung, height), done, QRect(0, 0, int(sung * ratio), done.height()))
+
+
+class LyricPanel(SkinWindow):
+    """歌词窗口：布局取自 Skin.xml 的 lyric_window，中间是滚动歌词"""
+
+    PROGRESS_INTERVAL = 50  # 逐字高亮的刷新间隔（毫秒）
+
+    def __init__(self, first):
+        super().__init__()
+        self.first = first
+        self.skin_applied = {}
+
+        self.view = LyricView(self)
+        self.close_button = QPushButton(self)
+        self.close_button.clicked.connect(self.hide)
+        self.ontop = QPushButton(self)
+        self.ontop.setToolTip("置顶")
+        self.ontop.clicked.connect(self.toggle_on_top)
+        self.desklrc = QPushButton(self)
+        self.desklrc.setToolTip("桌面歌词")
+        self.desklrc.clicked.connect(first.lrc_win)
+        for button in (self.close_button, self.ontop, self.desklrc):
+            button.setStyleSheet("border: none; padding: 0px; margin: 0px; background: transparent;")
+
+        # 逐字歌词的高亮进度只在窗口显示且正在播放时刷新
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(self.PROGRESS_INTERVAL)
+        self.progress_timer.timeout.connect(self.update_progress)
+        first.player.stateChanged.connect(self.on_state)
+
+        self.apply_skin(first.skin_layout)
+
+    def apply_skin(self, layout):
+        skin = self.first.skin
+        skin.apply_background(self, layout, 'lyric_window', self.skin_applied)
+        for button, element in ((self.close_button, 'close'), (self.ontop, 'ontop'), (self.desklrc, 'desklrc')):
+            skin.apply_icon(button, layout, 'lyric_window', element, self.skin_applied)
+
+        rect = layout.place('lyric_window', 'lyric')
+        if rect:
+            self.view.setGeometry(*rect)
+        self.view.apply_skin(layout)
+
+    def show_lyrics(self, lyrics, index=-1):
+        self.view.set_lyrics(lyrics)
+        self.view.set_current(index)
+        self.on_state(self.first.player.state())
+
+    def set_current(self, index):
+        self.view.set_current(index)
+
+    def on_state(self, state):
+        if state == QMediaPlayer.PlayingState and self.isVisible() and any(self.view.lyrics.words):
+            self.progress_timer.start()
+        else:
+            self.progress_timer.stop()
+
+    def update_progress(self):
+        view = self.view
+        if not 0 <= view.index < len(view.lyrics):
+            return
+        playlist = self.first.list
+        lead = playlist.lyric_lead if playlist is not None else 0
+        view.set_progress(view.lyrics.line_progress(view.index, self.first.player.position() + lead))
+
+    def toggle_on_top(self):
+        self.setWindowFlags(self.windowFlags() ^ Qt.WindowStaysOnTopHint)
+        self.show()  # 必须重新 show() 才能生效
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.on_state(self.first.player.state())
+
+    def hideEvent(self, event):
+        self.progress_timer.stop()
+        super().hideEvent(event)
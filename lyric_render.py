@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from PyQt5.QtWidgets import QLabel, QStyle, QStyleOption
+from PyQt5.QtCore import Qt, QEasingCurve, QVariantAnimation
+from PyQt5.QtGui import QFont, QFontMetrics, QPainter, QPixmap
+
+# 缓存的歌词图片张数（一行 36px 粗体歌词约 100KB）
+MAX_LINES = 64
+# 换行后提前渲染后面几句
+PRERENDER_LINES = 2
+
+
+class LyricPixmapCache:
+    """歌词文字图片的 LRU 缓存：同样的文字、字体、颜色只光栅化一次"""
+
+    def __init__(self, max_size=MAX_LINES):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, font, color, ratio=1.0):
+        key = (text, font.key(), color.rgba(), ratio)
+        pixmap = self._entries.get(key)
+        if pixmap is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pixmap
+        self.misses += 1
+        pixmap = self.render(text, font, color, ratio)
+        self._entries[key] = pixmap
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)  # 淘汰最久未使用的
+        return pixmap
+
+    @staticmethod
+    def render(text, font, color, ratio=1.0):
+        """把一行文字画到透明图片上（按屏幕缩放比例提高分辨率）"""
+        metrics = QFontMetrics(font)
+        width = max(metrics.horizontalAdvance(text), 1)
+        height = max(metrics.height(), 1)
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawText(0, metrics.ascent(), text)
+        painter.end()
+        return pixmap
+
+
+# 主窗口和悬浮歌词框共用
+lyric_pixmaps = LyricPixmapCache()
+
+
+class FadingLabel(QLabel):
+    """带淡入淡出动画的标签。
+
+    文字预先画成图片放进 lyric_pixmaps，动画每一帧只按透明度贴图，不再重新排版和光栅化文字。
+    字体、颜色、背景仍由样式表设置。
+    """
+
+    def __init__(self, text="", parent=None, duration=800):
+        super().__init__(text, parent)
+        self.setAlignment(Qt.AlignCenter)
+
+        # 设置字体样式
+        font = QFont()
+        font.setPointSize(18)
+        font.setBold(True)
+        self.setFont(font)
+
+        # 透明度动画
+        self.opacity = 1.0
+        self.animation = QVariantAnimation(self)
+        self.animation.setDuration(duration)  # 动画持续时间
+        self.animation.setEasingCurve(QEasingCurve.InOutQuad)
+        self.animation.valueChanged.connect(self._set_opacity)
+
+    def _set_opacity(self, value):
+        self.opacity = value
+        self.update()
+
+    def text_pixmap(self, text):
+        return lyric_pixmaps.get(text, self.font(), self.palette().color(self.foregroundRole()),
+                                 self.devicePixelRatioF())
+
+    def prerender(self, texts):
+        """提前渲染接下来要显示的几句，换行时直接取缓存"""
+        for text in texts:
+            if text:
+                self.text_pixmap(text)
+
+    def fade_in(self):
+        """淡入效果"""
+        self._fade(0.0, 1.0)
+        self.setVisible(True)
+
+    def fade_out(self):
+        """淡出效果"""
+        self._fade(1.0, 0.0)
+        self.animation.finished.connect(self._hide_after_fade)
+
+    def _fade(self, start, end):
+        self.animation.stop()
+        try:
+            self.animation.finished.disconnect(self._hide_after_fade)
+        except TypeError:
+            pass
+        self.opacity = start
+        self.animation.setStartValue(start)
+        self.animation.setEndValue(end)
+        self.animation.start()
+
+    def _hide_after_fade(self):
+        self.animation.finished.disconnect(self._hide_after_fade)
+        self.setVisible(False)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        # 样式表中的背景和边框
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PE_Widget, option, painter, self)
+        text = self.text()
+        if not text or self.opacity <= 0:
+            return
+        pixmap = self.text_pixmap(text)
+        ratio = pixmap.devicePixelRatio() or 1.0
+        width, height = int(pixmap.width() / ratio), int(pixmap.height() / ratio)
+        area = self.contentsRect()
+        align = self.alignment()
+        if align & Qt.AlignHCenter:
+            x = area.x() + (area.width() - width) // 2
+        elif align & Qt.AlignRight:
+            x = area.right() - width
+        else:
+            x = area.x()
+        if align & Qt.AlignTop:
+            y = area.y()
+        elif align & Qt.AlignBottom:
+            y = area.bottom() - height
+        else:
+            y = area.y() + (area.height() - height) // 2
+        painter.setOpacity(self.opacity)
+        painter.drawPixmap(x, y, pixmap)
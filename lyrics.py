@@ -0,0 +1,288 @@
+import os
+import re
+import json
+import sqlite3
+from array import array
+from collections import OrderedDict
+
+# 依次尝试的歌词文件编码
+ENCODINGS = ["utf-8", "gbk", "gb2312", "latin-1"]
+
+# 解析结果格式变化时加一，磁盘缓存中旧版本的数据会被忽略
+CACHE_VERSION = 4
+
+
+def decode_lyric_bytes(data, preferred=None):
+    """在内存中尝试多种编码解码，返回 (文本, 编码)；优先尝试上次成功的编码"""
+    encodings = ENCODINGS if preferred is None else [preferred] + [e for e in ENCODINGS if e != preferred]
+    for encoding in encodings:
+        try:
+            text = data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        # 带 BOM 的 UTF-8 文件，去掉开头的 \ufeff，否则第一行的标签无法识别
+        if text.startswith('\ufeff'):
+            text = text[1:]
+        return text, encoding
+    return None, None
+
+
+# 行首的一个或多个 [...] 标签，后面是歌词正文
+LINE_RE = re.compile(r'^((?:\[[^\]]*\])+)(.*)$')
+TAG_RE = re.compile(r'\[([^\]]*)\]')
+# 时间标签 mm:ss、mm:ss.x、mm:ss.xx、mm:ss.xxx（也兼容 mm:ss:xx）
+TIME_RE = re.compile(r'^\s*(\d+):(\d{1,2})(?:[.:](\d{1,3}))?\s*$')
+# 元数据标签，如 ti:、ar:、al:、by:、offset:
+META_RE = re.compile(r'^([A-Za-z#]+)\s*:(.*)$')
+# 增强格式的逐字时间标签 <mm:ss.xx>
+WORD_RE = re.compile(r'<(\d+):(\d{1,2})(?:[.:](\d{1,3}))?>')
+
+
+def _to_ms(minutes, seconds, fraction):
+    """把时间标签换算成毫秒；小数部分按位数区分 1/10、1/100、1/1000 秒"""
+    ms = int(minutes) * 60000 + int(seconds) * 1000
+    if fraction:
+        ms += int(fraction) * (100, 10, 1)[len(fraction) - 1]
+    return ms
+
+
+def _parse_words(body, start):
+    """拆分逐字时间，返回 ((毫秒, 文字), ...)；没有逐字标签时返回 None。
+
+    后面没有文字的标签（如行尾的 <mm:ss.xx>）记为文字为空的一项，表示前一个字的结束时间。
+    """
+    pieces = WORD_RE.split(body)
+    if len(pieces) == 1:
+        return None
+    words = []
+    # 第一个逐字标签之前的文字从行首时间开始
+    if pieces[0].strip():
+        words.append((start, pieces[0]))
+    for i in range(1, len(pieces), 4):
+        words.append((_to_ms(pieces[i], pieces[i + 1], pieces[i + 2]), pieces[i + 3]))
+    if not any(text for _, text in words):
+        return None
+    return tuple(words)
+
+
+class Lyrics:
+    """按列存放的歌词：times 为有序时间戳数组，texts 为对应歌词，words 为逐字时间（可为 None）"""
+
+    __slots__ = ('times', 'texts', 'words', 'tags')
+
+    def __init__(self, times=(), texts=(), words=(), tags=None):
+        self.times = array('q', times)
+        self.texts = list(texts)
+        self.words = list(words) if words else [None] * len(self.texts)
+        self.tags = tags or {}
+
+    def __len__(self):
+        return len(self.times)
+
+    def line_progress(self, index, position):
+        """当前行已唱过的比例（0~1），用于卡拉 OK 式逐字高亮；没有逐字时间时整行高亮"""
+        words = self.words[index]
+        if not words:
+            return 1.0
+        total = sum(len(text) for _, text in words)
+        if not total:
+            return 1.0
+        if not words[-1][1]:
+            # 行尾的结束时间标签
+            line_end = words[-1][0]
+        elif index + 1 < len(self.times):
+            line_end = self.times[index + 1]
+        else:
+            line_end = words[-1][0] + 1000
+        done = 0.0
+        for i, (start, text) in enumerate(words):
+            if position < start:
+                break
+            end = words[i + 1][0] if i + 1 < len(words) else line_end
+            if position >= end or end <= start:
+                done += len(text)
+            else:
+                done += len(text) * (position - start) / (end - start)
+                break
+        return min(done / total, 1.0)
+
+    def to_json(self):
+        return json.dumps({'times': list(self.times), 'texts': self.texts,
+                           'words': self.words, 'tags': self.tags}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, data):
+        data = json.loads(data)
+        words = [tuple(tuple(word) for word in line) if line else None for line in data['words']]
+        return cls(data['times'], data['texts'], words, data['tags'])
+
+
+def parse_lrc(text):
+    """单遍解析 LRC 文本，支持多时间标签、[offset:]、元数据标签和 <mm:ss.xx> 逐字时间"""
+    tags = {}
+    entries = []
+    for line in text.splitlines():
+        match = LINE_RE.match(line.strip())
+        if not match:
+            continue
+
+        stamps = []
+        for tag in TAG_RE.findall(match.group(1)):
+            time_match = TIME_RE.match(tag)
+            if time_match:
+                stamps.append(_to_ms(*time_match.groups()))
+                continue
+            meta = META_RE.match(tag)
+            if meta:
+                tags[meta.group(1).lower()] = meta.group(2).strip()
+        if not stamps:
+            continue
+
+        body = match.group(2)
+        line_text = WORD_RE.sub('', body).strip()
+        words = _parse_words(body, stamps[0])
+        for ms in stamps:
+            line_words = words
+            # 同一行有多个时间标签时，逐字时间跟着平移
+            if words and ms != stamps[0]:
+                line_words = tuple((start + ms - stamps[0], word) for start, word in words)
+            entries.append((ms, line_text, line_words))
+
+    # [offset:+500] 表示歌词整体提前 500 毫秒
+    try:
+        offset = int(tags.get('offset', 0))
+    except ValueError:
+        offset = 0
+    if offset:
+        entries = [(max(ms - offset, 0), line_text,
+                    tuple((max(start - offset, 0), word) for start, word in words) if words else None)
+                   for ms, line_text, words in entries]
+
+    # 按时间排序（稳定排序，时间相同时保持文件中的顺序）
+    entries.sort(key=lambda entry: entry[0])
+    return Lyrics([entry[0] for entry in entries], [entry[1] for entry in entries],
+                  [entry[2] for entry in entries], tags)
+
+
+def lyric_key(lrc_path):
+    """缓存键：路径 + 修改时间 + 文件大小；文件不存在时返回 None"""
+    try:
+        stat = os.stat(lrc_path)
+    except OSError:
+        return None
+    return lrc_path, stat.st_mtime_ns, stat.st_size
+
+
+def read_lyrics(lrc_path, preferred=None):
+    """读取并解析歌词文件，返回 (缓存键, 编码, 歌词)；不访问缓存，可在后台线程中调用"""
+    key = lyric_key(lrc_path)
+    if key is None:
+        return None
+    # 只读一次文件，在内存中尝试各种编码
+    try:
+        with open(lrc_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        print(f"歌词读取失败：{e}")
+        return None
+    text, encoding = decode_lyric_bytes(data, preferred)
+    if text is None:
+        return None
+    return key, encoding, parse_lrc(text)
+
+
+class LyricCache:
+    """已解析歌词的 LRU 缓存，以 路径 + 修改时间 + 文件大小 为键，并记住每个文件的编码"""
+
+    def __init__(self, max_size=64, disk_path="./lyric_cache.db"):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        # 每个歌词文件上次解码成功的编码
+        self.encodings = {}
+
+        # 可选的磁盘缓存，重启后重复播放也无需再解析
+        self.conn = None
+        if disk_path:
+            try:
+                self.conn = sqlite3.connect(disk_path)
+                self.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS lyrics ("
+                    "path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, "
+                    "version INTEGER, encoding TEXT, data TEXT)"
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"歌词缓存打开失败：{e}")
+                self.conn = None
+
+    def load(self, lrc_path):
+        """返回解析好的歌词；文件不存在或无法解码时返回 None"""
+        key = lyric_key(lrc_path)
+        if key is None:
+            return None
+        lyrics = self._lookup(key)
+        if lyrics is None:
+            result = read_lyrics(lrc_path, self.encodings.get(lrc_path))
+            if result is None:
+                return None
+            key, encoding, lyrics = result
+            self.put(key, encoding, lyrics)
+        return lyrics
+
+    def contains(self, lrc_path):
+        """歌词是否已在内存或磁盘缓存中（磁盘命中时顺便载入内存）"""
+        key = lyric_key(lrc_path)
+        return key is not None and self._lookup(key) is not None
+
+    def put(self, key, encoding, lyrics):
+        """放入已解析的歌词，可由后台线程解析后交回主线程调用"""
+        self.encodings[key[0]] = encoding
+        self._remember(key, lyrics)
+        self._save_to_disk(key, encoding, lyrics)
+
+    def _lookup(self, key):
+        # 内存命中
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        # 磁盘命中
+        lyrics = self._load_from_disk(key)
+        if lyrics is not None:
+            self._remember(key, lyrics)
+        return lyrics
+
+    def _remember(self, key, lyrics):
+        self._entries[key] = lyrics
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)  # 淘汰最久未使用的
+
+    def _load_from_disk(self, key):
+        if self.conn is None:
+            return None
+        path, mtime, size = key
+        row = self.conn.execute("SELECT mtime, size, version, encoding, data FROM lyrics WHERE path = ?",
+                                (path,)).fetchone()
+        if row is None:
+            return None
+        if row[3]:
+            self.encodings[path] = row[3]
+        if (row[0], row[1], row[2]) != (mtime, size, CACHE_VERSION):
+            return None
+        return Lyrics.from_json(row[4])
+
+    def _save_to_disk(self, key, encoding, lyrics):
+        if self.conn is None:
+            return
+        path, mtime, size = key
+        try:
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO lyrics VALUES (?, ?, ?, ?, ?, ?)",
+                                  (path, mtime, size, CACHE_VERSION, encoding,
+                                   lyrics.to_json()))
+        except sqlite3.Error as e:
+            print(f"歌词缓存写入失败：{e}")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# 读取标签需要 mutagen（可选依赖：pip install mutagen），没有安装时只显示文件名
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+# 每个子进程任务处理的文件数
+CHUNK_SIZE = 200
+
+
+def _first_tag(tags, key):
+    try:
+        value = tags.get(key)
+    except (KeyError, ValueError):
+        return None
+    if not value:
+        return None
+    return str(value[0] if isinstance(value, list) else value).strip() or None
+
+
+def read_metadata(path):
+    """读取一个文件的 (标题, 歌手, 专辑, 时长毫秒)；读不到的项为 None"""
+    title = artist = album = duration = None
+    try:
+        audio = mutagen.File(path, easy=True)
+    except Exception as e:
+        print(f"读取标签失败：{path} {e}")
+        audio = None
+    if audio is not None:
+        if audio.tags is not None:
+            title = _first_tag(audio.tags, 'title')
+            artist = _first_tag(audio.tags, 'artist')
+            album = _first_tag(audio.tags, 'album')
+        length = getattr(audio.info, 'length', None)
+        if length:
+            duration = int(length * 1000)
+    return title, artist, album, duration
+
+
+def index_chunk(items):
+    """子进程中运行：items 为 [(路径, 缓存中的修改时间, 缓存中的大小)]，只读取有变化的文件"""
+    results = []
+    for path, cached_mtime, cached_size in items:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if (stat.st_mtime_ns, stat.st_size) == (cached_mtime, cached_size):
+            continue
+        results.append((path, stat.st_mtime_ns, stat.st_size) + read_metadata(path))
+    return results
+
+
+class MetadataCache:
+    """持久化的标签/时长缓存，以 路径 + 修改时间 为准；启动时整体读入内存"""
+
+    def __init__(self, db_path="./metadata_cache.db"):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            "path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, "
+            "title TEXT, artist TEXT, album TEXT, duration INTEGER)"
+        )
+        self.conn.commit()
+        # 路径 -> (标题, 歌手, 专辑, 时长)
+        self.entries = {}
+        # 路径 -> (修改时间, 大小)
+        self.stamps = {}
+        for path, mtime, size, title, artist, album, duration in self.conn.execute("SELECT * FROM metadata"):
+            self.entries[path] = (title, artist, album, duration)
+            self.stamps[path] = (mtime, size)
+
+    def get(self, path):
+        return self.entries.get(path)
+
+    def put_many(self, rows):
+        """rows 为 index_chunk 的结果，一次事务写入"""
+        if not rows:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        for path, mtime, size, title, artist, album, duration in rows:
+            self.entries[path] = (title, artist, album, duration)
+            self.stamps[path] = (mtime, size)
+
+    def set_duration(self, path, duration):
+        """播放时得知的时长也记下来，下次启动直接显示"""
+        title, artist, album, old = self.entries.get(path, (None, None, None, None))
+        if old == duration:
+            return False
+        self.entries[path] = (title, artist, album, duration)
+        # 还没被索引过的文件不记修改时间，之后仍会读取标签
+        mtime, size = self.stamps.setdefault(path, (None, None))
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (path, mtime, size, title, artist, album, duration))
+        return True
+
+    def close(self):
+        self.conn.close()
+
+
+class MetadataIndexer(QObject):
+    """在进程池中后台读取标签和时长，结果写入缓存后通知界面"""
+
+    indexed = pyqtSignal(list)  # 更新了元数据的路径
+    _chunkDone = pyqtSignal(list)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.executor = None
+        self._chunkDone.connect(self._on_chunk_done)
+        if mutagen is None:
+            print("未安装 mutagen，播放列表只显示文件名（pip install mutagen）")
+
+    def index(self, paths):
+        """检查并索引这些文件；缓存中修改时间和大小都没变的文件由子进程直接跳过"""
+        if mutagen is None or not paths:
+            return
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor()
+        stamps = self.cache.stamps
+        items = [(path,) + stamps.get(path, (None, None)) for path in paths]
+        for start in range(0, len(items), CHUNK_SIZE):
+            future = self.executor.submit(index_chunk, items[start:start + CHUNK_SIZE])
+            # 回调在后台线程中执行，通过信号转回主线程
+            future.add_done_callback(self._on_future_done)
+
+    def _on_future_done(self, future):
+        if future.cancelled():
+            return
+        try:
+            rows = future.result()
+        except Exception as e:
+            print(f"元数据索引失败：{e}")
+            return
+        if rows:
+            self._chunkDone.emit(rows)
+
+    def _on_chunk_done(self, rows):
+        self.cache.put_many(rows)
+        self.indexed.emit([row[0] for row in rows])
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -1,79 +1,117 @@
 import sys
+import os
 
-from PyQt5.QtWidgets import QLabel, QGraphicsOpacityEffect, QShortcut, QSlider, QApplication, QPushButton, QWidget, QMessageBox
-from PyQt5 import uic
-from PyQt5.QtCore import QPropertyAnimation, QRect, QEasingCurve, Qt, pyqtSignal
-from PyQt5.QtGui import QFont, QPalette, QBrush, QPainter, QPainterPath, QKeySequence, QPixmap, QIcon
+import startup_trace
+startup_trace.start()  # 设置了 TTPLAYER_TRACE 或 --trace-startup 时记录启动各阶段耗时
+
+from PyQt5.QtWidgets import QLabel, QShortcut, QSlider, QApplication, QPushButton, QWidget, QMessageBox
+from PyQt5.QtCore import QPropertyAnimation, QRect, Qt, pyqtSignal, QTimer
+from PyQt5.QtGui import QPainter, QKeySequence, QPixmap, QIcon
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaPlaylist
 
-import playlist
 import lrcwin
+from lyric_render import FadingLabel
+from equalizer import Equalizer, available as equalizer_available, load_settings
+from playback import PlaybackEngine
+from skin_cache import SkinCache
+from skin_loader import load_skin, DEFAULT_SKIN, TEXT_FONT
+from ui_cache import load_ui
+from visualizer import SpectrumWidget
 
 
 
-class FadingLabel(QLabel):
-    """带淡入淡出动画的标签"""
-
-    def __init__(self, text="", parent=None):
-        super().__init__(text, parent)
-        self.setAlignment(Qt.AlignCenter)
-
-        # 设置字体样式
-        font = QFont()
-        font.setPointSize(18)
-        font.setBold(True)
-        self.setFont(font)
-
-        # 透明度效果和动画
-        self.effect = QGraphicsOpacityEffect(self)
-        self.setGraphicsEffect(self.effect)
-        self.animation = QPropertyAnimation(self.effect, b"opacity")
-        self.animation.setDuration(800)  # 动画持续时间
-        self.animation.setEasingCurve(QEasingCurve.InOutQuad)
-
-    def fade_in(self):
-        """淡入效果"""
-        self.animation.stop()
-        self.effect.setOpacity(0)
-        self.setVisible(True)
-        self.animation.setStartValue(0)
-        self.animation.setEndValue(1)
-        self.animation.start()
-
-    def fade_out(self):
-        """淡出效果"""
-        self.animation.stop()
-        self.effect.setOpacity(1)
-        self.animation.setStartValue(1)
-        self.animation.setEndValue(0)
-        self.animation.finished.connect(lambda: self.setVisible(False))
-        self.animation.start()
-
-
 # 自定义滑块类
 class ImageSlider(QSlider):
+    """皮肤图片画成的滑块：底图和已播放部分的填充图预先缓存成控件大小的图层，
+    值变化时只刷新滑块移动经过的那一小块区域"""
+
     def __init__(self, pixmap, parent=None):
         super().__init__(Qt.Horizontal, parent)
         self.setRange(0, 100)  # 设置范围
         self.current_volume = 60
         self.setValue(0)
         self.handle_pixmap = pixmap  # 保存你的图片对象
+        self.bar_pixmap = QPixmap()  # Skin.xml 的 bar_image（轨道底图）
+        self.fill_pixmap = QPixmap()  # Skin.xml 的 fill_image（已播放部分）
+        self.layers = None  # 缓存的 (底图层, 填充层)
+        self.painted_x = None  # 上次绘制时滑块的 x 坐标
+
+    def set_handle_pixmap(self, pixmap):
+        """更换滑块图片（切换皮肤时使用）"""
+        self.handle_pixmap = pixmap
+        self.invalidate()
+
+    def set_layer_pixmaps(self, bar, fill):
+        """更换轨道底图和填充图（切换皮肤时使用）"""
+        self.bar_pixmap = bar
+        self.fill_pixmap = fill
+        self.invalidate()
+
+    def invalidate(self):
+        self.layers = None
+        self.painted_x = None
+        self.update()
+
+    def handle_x(self):
+        """当前值对应的滑块 x 坐标"""
+        # 注意：QSlider 的 groove（轨道）宽度是控件宽度减去滑块宽度
+        available_width = self.width() - self.handle_pixmap.width()
+        min_val, max_val = self.minimum(), self.maximum()
+        if max_val <= min_val:
+            return 0
+        # 将当前值映射到 x 坐标
+        return int(available_width * (self.value() - min_val) / (max_val - min_val))
+
+    def sliderChange(self, change):
+        if change != QSlider.SliderValueChange or self.painted_x is None:
+            super().sliderChange(change)
+            return
+        # 值变了但滑块没有移动一个像素时不重绘；移动了只刷新旧位置到新位置之间（含两处滑块）
+        new_x = self.handle_x()
+        if new_x != self.painted_x:
+            left = min(new_x, self.painted_x)
+            right = max(new_x, self.painted_x) + self.handle_pixmap.width()
+            self.update(QRect(left, 0, right - left, self.height()))
+
+    def resizeEvent(self, event):
+        self.layers = None
+        self.painted_x = None
+        super().resizeEvent(event)
+
+    def build_layers(self):
+        """把底图和填充图拉伸到控件宽度、垂直居中，各画成一张控件大小的图"""
+        layers = []
+        for source in (self.bar_pixmap, self.fill_pixmap):
+            layer = QPixmap(self.size())
+            layer.fill(Qt.transparent)
+            if not source.isNull():
+                painter = QPainter(layer)
+                y = (self.height() - source.height()) // 2
+                painter.drawPixmap(QRect(0, y, self.width(), source.height()), source)
+                painter.end()
+            layers.append(layer)
+        self.layers = layers
 
     def paintEvent(self, event):
-        # 不调用父类的 paintEvent，避免画出默认滑块
+        # 不调用父类的 paintEvent，避免画出默认滑块；Qt 已把绘制裁剪到需要刷新的区域
+        if self.layers is None:
+            self.build_layers()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        startup_trace.count("进度条重绘")
+        area = event.rect()
 
         # 计算滑块位置
-        # 注意：QSlider 的 groove（轨道）宽度是控件宽度减去滑块宽度
-        available_width = self.width() - self.handle_pixmap.width()
-        min_val, max_val = self.minimum(), self.maximum()
-        current_val = self.value()
-
-        # 将当前值映射到 x 坐标
-        handle_x = int(available_width * (current_val - min_val) / (max_val - min_val))
+        handle_x = self.handle_x()
+        self.painted_x = handle_x
         handle_y = (self.height() - self.handle_pixmap.height()) // 2  # 垂直居中
 
+        background, fill = self.layers
+        painter.drawPixmap(area, background, area)
+        # 填充到滑块中间
+        filled = area.intersected(QRect(0, 0, handle_x + self.handle_pixmap.width() // 2, self.height()))
+        if not filled.isEmpty():
+            painter.drawPixmap(filled, fill, filled)
+
         # 绘制图片作为滑块
         painter.drawPixmap(handle_x, handle_y, self.handle_pixmap)
 
@@ -134,19 +172,55 @@ class ClickableLabel(QLabel):
             self.clicked.emit()  # 发出点击信号
         super().mousePressEvent(event)
 class Window(QWidget):
+    # 播放位置通知间隔（毫秒）；0 表示按进度条精度自动决定：滑块走一个像素所需的时间，不超过 1 秒
+    NOTIFY_INTERVAL = 0
+    # 自动模式可选的通知间隔：都是 1000 的约数，时间标签跨整秒时最多晚 250 毫秒，且每秒都会更新
+    NOTIFY_STEPS = (50, 100, 125, 200, 250)
+    # 按钮 -> (皮肤中的窗口, 元素)；Skin.xml 的主窗口没有置顶按钮，借用歌词窗口的图片，位置保持 .ui 中的设置
+    SKIN_BUTTONS = {
+        'music_list': ('player_window', 'playlist'),
+        'preview': ('player_window', 'prev'),
+        'btn_play': ('player_window', 'pause'),
+        'next': ('player_window', 'next'),
+        'fixed': ('lyric_window', 'ontop'),
+        'mini_top': ('player_window', 'minimode'),
+        'min': ('player_window', 'minimize'),
+        'close': ('player_window', 'exit'),
+        'btn_lrc': ('player_window', 'lyric'),
+        'btn_pause': ('player_window', 'play'),
+        'btn_eq': ('player_window', 'equalizer'),
+    }
+    # 文字标签 -> Skin.xml 中的元素
+    SKIN_LABELS = {
+        'status_label': 'info',
+        'shuffle_label': 'status',
+        'current_time_label': 'led',
+    }
+
     def __init__(self):
         super().__init__()
         self.ui = None
         # 启用拖放支持
         self.setAcceptDrops(True)
 
-        # 播放器核心组件
-        self.player = QMediaPlayer()
+        # 播放器核心组件（双播放器引擎，overlap 为交叉淡入淡出时长，0 表示无缝衔接）
+        self.player = PlaybackEngine(overlap=0)
+        # 均衡器（需要 numpy），上次启用过的话播放改走经过均衡器的 PcmPlayer；窗口第一次打开时才创建
+        self.equalizer = Equalizer() if equalizer_available() else None
+        self.eq_window = None
+        if self.equalizer is not None and load_settings(self.equalizer):
+            self.player.set_equalizer(self.equalizer)
+        # 皮肤图片缓存，主窗口和播放列表共用
+        self.skin = SkinCache()
+        # 皮肤描述（Skin.xml 等），以及各控件当前使用的图片，切换皮肤时只更新变化的部分
+        self.skin_layout = load_skin(DEFAULT_SKIN)
+        self.skin_applied = {}
         self.playlist = []
         self.all_playlist = QMediaPlaylist(self.player)
         self.current_index = 0
         self.shuffle_mode = False
         self.current_playing_path = None
+        self.shown_second = None  # 时间标签当前显示的秒数
         self.init_ui()
 
         # 滚轮累积变量
@@ -188,60 +262,24 @@ class Window(QWidget):
         print("【槽函数】滚轮向下")
 
     def init_ui(self):
-        self.ui = uic.loadUi("./Designer_ui/player.ui", self)
+        with startup_trace.phase("load_ui player.ui"):
+            self.ui = load_ui("./Designer_ui/player.ui", self)
         # 去掉标题栏
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.move(800, 400)
         # 启动时渐显动画
         self.start_animation(0, 1)
 
-        # 加载主窗口背景图
-        self.background_path = "./skin/Purple/player_skin.bmp"
-        pixmap = QPixmap(self.background_path)  #将图片转换成图片对象
-        pixmap = self.round_pixmap(pixmap, 8)  # 将图片圆角处理
-        # 设置窗口大小为图片大小
-        self.setFixedSize(pixmap.width(), pixmap.height())
-        # 或者保持原图大小，居中/左上对齐显示
-        palette = QPalette()
-        palette.setBrush(QPalette.Window, QBrush(pixmap))  # 原图大小
-        self.setPalette(palette)
+        # 按钮组渲染（图片和位置由 apply_skin 按皮肤设置）
         self.setAutoFillBackground(True)
+        # .ui 中没有均衡器按钮，在这里创建
+        self.btn_eq = QPushButton(self)
+        self.btn_eq.setToolTip("均衡器")
+        for name in self.SKIN_BUTTONS:
+            key = getattr(self, name)
 
-        # 按钮组渲染
-        btn = {
-            self.music_list: './skin/Purple/playlist.bmp',
-            self.preview: './skin/Purple/prev.bmp',
-            self.btn_play: './skin/Purple/pause.bmp',
-            self.next: './skin/Purple/next.BMP',
-            self.fixed: './skin/Purple/ontop.bmp',
-            self.mini_top: './skin/Purple/minimode.bmp',
-            self.min: './skin/Purple/minimize.bmp',
-            self.close: './skin/Purple/close.bmp',
-            self.btn_lrc: './skin/Purple/lyric.bmp',
-            self.btn_pause: './skin/Purple/play.bmp'
-        }
-        for key in btn:
-            self.temp = self.crop_image_into_four_horizontal(btn[key])
-            # 将 QPixmap 设置给 QPushButton
-            icon = QIcon()
-            round = 3
-            # icon = QIcon(self.round_pixmap(self.temp[0][0],3))
-            icon_normal = self.round_pixmap(self.temp[0][0], round)
-            icon_hover = self.round_pixmap(self.temp[0][1], round)
-            icon_pressed = self.round_pixmap(self.temp[0][2], round)
-
-            def setup_hover_pressed_icon(button, normal_pixmap, hover_pixmap, pressed_pixmap):
+            def setup_hover_pressed_icon(button):
                 """为任意 QPushButton 添加 hover/pressed 图标切换功能"""
-                # 创建图标
-                button._icons = {
-                    'normal': QIcon(normal_pixmap),
-                    'hover': QIcon(hover_pixmap),
-                    'pressed': QIcon(pressed_pixmap)
-                }
-
-                # 初始图标
-                button.setIcon(button._icons['normal'])
-                button.setIconSize(button.size())
                 button.setStyleSheet("border: none; background: transparent;")
 
                 # 定义事件处理函数
@@ -273,15 +311,7 @@ class Window(QWidget):
                 key.mouseReleaseEvent = mouse_release_event
 
             # 给按钮“打补丁”：绑定事件
-            setup_hover_pressed_icon(key, icon_normal, icon_hover, icon_pressed)
-            icon.addPixmap(icon_normal, QIcon.Normal, QIcon.Off)
-            # icon.addPixmap(icon_hover, QIcon.Active, QIcon.Off)  # hover
-            # icon.addPixmap(icon_pressed, QIcon.Selected, QIcon.On)  # pressed
-
-            # icon = round_pixmap(icon,3)
-            key.setIcon(icon)
-            # 设置图标大小为按钮大小
-            key.setIconSize(key.size())
+            setup_hover_pressed_icon(key)
             key.setStyleSheet("""
                 QPushButton {
                     border: none;
@@ -293,41 +323,22 @@ class Window(QWidget):
 
         # 暂停按钮先隐藏
         self.btn_pause.setVisible(False)
-        # 创建自定义播放进度滑块
-        pixmap = self.crop_image_into_four_horizontal('./skin/Purple/progress_thumb.bmp')
-        pixmap = self.round_pixmap(pixmap[0][0], round)
-        self.progress_slider = ImageSlider(pixmap)
-        self.progress_slider.move(10, 112)
-        # self.slider.setMaximumSize(400, 30)  # 宽度最多为400像素
-        self.progress_slider.setFixedWidth(290)  # 设置滑块的宽度为300像素
-
+        # 创建自定义播放进度滑块（滑块图片和位置由 apply_skin 设置）
+        self.progress_slider = ImageSlider(QPixmap())
         # 将标签添加到窗口（注意：不是 layout，而是直接 setParent）
         self.progress_slider.setParent(self)  # self 是你的主窗口（QWidget）
 
         # 创建自定义音量滑块
-        pixmap = self.crop_image_into_four_horizontal('./skin/Purple/progress_thumb.bmp')
-        pixmap = self.round_pixmap(pixmap[0][0], round)
-        # 获取原始宽度和高度
-        original_width = pixmap.width()
-        original_height = pixmap.height()
-
-        # 计算放大后的宽度和高度
-        scaled_width = int(original_width * 1.1)
-        scaled_height = int(original_height * 1.1)
-
-        # 使用scaled方法生成放大后的QPixmap对象
-        # 保持原始的AspectRatio
-        pixmap = pixmap.scaled(scaled_width, scaled_height, Qt.KeepAspectRatio)
-        self.volume_slider = ImageSlider(pixmap)
-        self.volume_slider.move(205, 71)
-        # self.slider.setMaximumSize(400, 30)  # 宽度最多为400像素
-        self.volume_slider.setFixedWidth(92)  # 设置滑块的宽度为300像素
+        self.volume_slider = ImageSlider(QPixmap())
         # 设置初始位置为音量大小
         self.volume_slider.setValue(self.volume_slider.current_volume)
 
         # 将标签添加到窗口（注意：不是 layout，而是直接 setParent）
         self.volume_slider.setParent(self)  # self 是你的主窗口（QWidget）
 
+        # 频谱显示（位置和颜色由 apply_skin 设置），放在歌词标签下面
+        self.visualizer = SpectrumWidget(self.player, self)
+
         # 正在播放的歌词（大字体显示）
         self.current_lyric_label = FadingLabel("")
         # 浮动字幕设置为紫色
@@ -337,42 +348,31 @@ class Window(QWidget):
         # 关键：使用 move(x, y) 设置位置
         self.current_lyric_label.move(15, 30)
         # 将标签添加到窗口（注意：不是 layout，而是直接 setParent）
-        self.current_lyric_label.setParent(self)  # self 是你的主窗口（QWidget）        #创建播放列表窗口
-        self.list = playlist.PlayList(self.geometry().x(), self.geometry().y(), self.geometry().width(),
-                                      self.geometry().height(), self)
-
-        '''创建悬浮歌词框'''
-        self.lrc = lrcwin.LyricWindow()
-        self.lrc.move(self.list.geometry().x()+(self.list.geometry().width() / 2) - self.lrc.geometry().width() / 2,
-                      self.list.geometry().y()+self.list.geometry().height())
-        # self.lrc.show()
+        self.current_lyric_label.setParent(self)  # self 是你的主窗口（QWidget）
+        # 播放列表窗口在主窗口第一次绘制后再创建，悬浮歌词框第一次打开时才创建
+        self.list = None
+        self.lrc = None
+        self.lyric_panel = None
+        self.list_scheduled = False
         # 添加到主布局
         # main_layout.addWidget(control_frame)
 
         # # 功能组
         # 歌曲名_状态标签
         self.status_label = QLabel("就绪")
-        self.status_label.setFixedSize(500, 20)  # 最小尺寸
-        self.status_label.setAlignment(Qt.AlignLeft)
-        self.status_label.setStyleSheet("color: #ffffff; font-size: 14px;font-weight: 100;font-family: PingFang SC;")
-        self.status_label.move(15, 25)
         self.status_label.setParent(self)  # self 是你的主窗口（QWidget）        #创建播放列表窗口
         # 歌曲播放时间标签
         self.current_time_label = QLabel("")
-        self.current_time_label.setFixedSize(500, 20)  # 最小尺寸
-        self.current_time_label.setAlignment(Qt.AlignLeft)
-        self.current_time_label.setStyleSheet("color: #ffffff; font-size: 14px;font-weight: 100;font-family: PingFang SC;")
-        self.current_time_label.move(260, 25)
         self.current_time_label.setParent(self)  # self 是你的主窗口（QWidget）        #创建播放列表窗口
 
         # 歌曲播放时间标签
         self.shuffle_label = ClickableLabel("顺序播放")
-        self.shuffle_label.setFixedSize(500, 20)  # 最小尺寸
-        self.shuffle_label.setAlignment(Qt.AlignLeft)
-        self.shuffle_label.setStyleSheet("color: #ffffff; font-size: 14px;font-weight: 100;font-family: PingFang SC;")
-        self.shuffle_label.move(225, 93)
         self.shuffle_label.setParent(self)  # self 是你的主窗口（QWidget）
 
+        # 按皮肤设置背景、按钮、滑块和文字标签
+        with startup_trace.phase("Window.apply_skin"):
+            self.apply_skin(self.skin_layout)
+
         # 快捷键
         self.space_shortcut = QShortcut(QKeySequence(Qt.Key_Space), self)
         self.space_shortcut.activated.connect(self.play_audio)
@@ -386,10 +386,10 @@ class Window(QWidget):
         self.down_shortcut.activated.connect(self.decrease_volume)
         # 创建向右箭头快捷键
         self.down_shortcut = QShortcut(QKeySequence(Qt.Key_Right), self)
-        self.down_shortcut.activated.connect(self.list.play_next)
+        self.down_shortcut.activated.connect(lambda: self.ensure_list().play_next())
         # 创建向左箭头快捷键
         self.down_shortcut = QShortcut(QKeySequence(Qt.Key_Left), self)
-        self.down_shortcut.activated.connect(self.list.play_preview)
+        self.down_shortcut.activated.connect(lambda: self.ensure_list().play_preview())
 
         # 连接信号和槽
         self.close.clicked.connect(self.exit_all)
@@ -397,8 +397,8 @@ class Window(QWidget):
         self.min.clicked.connect(self.minimize_window)
         self.music_list.clicked.connect(self.musiclist)
         self.btn_play.clicked.connect(self.play_audio)
-        self.next.clicked.connect(self.list.play_next)
-        self.preview.clicked.connect(self.list.play_preview)
+        self.next.clicked.connect(lambda: self.ensure_list().play_next())
+        self.preview.clicked.connect(lambda: self.ensure_list().play_preview())
         self.player.positionChanged.connect(self.update_slider_position)
         self.player.durationChanged.connect(self.set_slider_duration)
         self.progress_slider.sliderPressed.connect(self.slider_pressed)
@@ -406,28 +406,102 @@ class Window(QWidget):
         self.volume_slider.valueChanged.connect(lambda v: self.player.setVolume(v))
         self.btn_pause.clicked.connect(self.play_audio)
         self.shuffle_label.clicked.connect(self.shuffle_mode_status)
-        self.btn_lrc.clicked.connect(self.lrc_win)
+        self.btn_lrc.clicked.connect(self.lyric_panel_win)
+        self.btn_eq.clicked.connect(self.eq_win)
 
         # 播放状态监听
         self.player.mediaStatusChanged.connect(self.handle_media_status)
 
-    # 圆角函数，将图片四角变圆
-    def round_pixmap(self, pixmap, radius):
-        rounded = QPixmap(pixmap.size())
-        rounded.fill(Qt.transparent)
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-
-        # 直接传 x, y, w, h
-        path = QPainterPath()
-        rect = pixmap.rect()
-        path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), radius, radius)
-        painter.setClipPath(path)
-
-        painter.drawPixmap(0, 0, pixmap)
-        painter.end()
-        return rounded
+        # 首次启动时渲染的皮肤图片写入图集
+        QTimer.singleShot(0, self.skin.save)
+
+    def apply_skin(self, layout):
+        """按皮肤描述设置背景、按钮、滑块和文字标签；切换皮肤时不重建控件，只更换变化了的图片"""
+        applied = self.skin_applied
+        # 主窗口背景
+        self.skin.apply_background(self, layout, 'player_window', applied)
+
+        # 按钮：四态图的前三张分别用于普通、悬停、按下
+        for name, (window, element) in self.SKIN_BUTTONS.items():
+            button = getattr(self, name)
+            image = layout.image(window, element)
+            if not image:
+                continue
+            normal = self.skin.pixmap(image, 0, 3)
+            if applied.get(button) != image:
+                button._icons = {
+                    'normal': QIcon(normal),
+                    'hover': QIcon(self.skin.pixmap(image, 1, 3)),
+                    'pressed': QIcon(self.skin.pixmap(image, 2, 3))
+                }
+                button.setIcon(button._icons['hover' if button.underMouse() else 'normal'])
+                applied[button] = image
+            # 只有主窗口里的元素才使用皮肤中的位置
+            rect = layout.place(window, element, (normal.width(), normal.height())) \
+                if window == 'player_window' else None
+            if rect:
+                button.setGeometry(*rect)
+            # 设置图标大小为按钮大小
+            button.setIconSize(button.size())
+
+        # 进度条和音量条
+        for slider, element in ((self.progress_slider, 'progress'), (self.volume_slider, 'volume')):
+            thumb = layout.image('player_window', element, 'thumb_image')
+            if thumb and applied.get(slider) != thumb:
+                slider.set_handle_pixmap(self.skin.pixmap(thumb, 0, 3))
+                applied[slider] = thumb
+            # 轨道底图和填充图（bar_image 常为空，轨道画在主窗口背景上）
+            layers = (layout.image('player_window', element, 'bar_image'),
+                      layout.image('player_window', element, 'fill_image'))
+            if applied.get((slider, 'layers')) != layers:
+                slider.set_layer_pixmaps(*(self.skin.image(path) if path else QPixmap() for path in layers))
+                applied[(slider, 'layers')] = layers
+            rect = layout.place('player_window', element)
+            if rect:
+                x, y, width, height = rect
+                # 滑块图片比轨道高时，以轨道为中心加高控件
+                handle = slider.handle_pixmap.height()
+                if handle > height:
+                    y -= (handle - height + 1) // 2
+                    height = handle
+                slider.setFixedSize(width, height)
+                slider.move(x, y)
+
+        # 频谱
+        self.visualizer.apply_skin(layout)
+
+        # 文字标签
+        for name, element in self.SKIN_LABELS.items():
+            label = getattr(self, name)
+            attrs = layout.element('player_window', element)
+            if not attrs or not attrs.get('rect'):
+                continue
+            x, y, width, height = attrs['rect']
+            label.setFixedSize(width, height)
+            label.move(x, y)
+            label.setAlignment((Qt.AlignRight if attrs.get('align') == 'right' else Qt.AlignLeft) | Qt.AlignVCenter)
+            label.setStyleSheet(f"color: {attrs.get('color', '#ffffff')}; font-size: {attrs.get('font_size', 14)}px;"
+                                f"font-weight: 100;font-family: {TEXT_FONT};")
+
+    def switch_skin(self, directory):
+        """运行时切换皮肤：控件保持不动，只重新设置图片、位置和颜色"""
+        layout = load_skin(directory)
+        if not layout.windows:
+            print(f"不是有效的皮肤目录：{directory}")
+            return False
+        self.skin_layout = layout
+        self.apply_skin(layout)
+        if self.list is not None:
+            self.list.apply_skin(layout)
+        if self.lyric_panel is not None:
+            self.lyric_panel.apply_skin(layout)
+        if self.eq_window is not None:
+            self.eq_window.apply_skin(layout)
+        icon = layout.image('player_window', 'icon')
+        if icon:
+            QApplication.instance().setWindowIcon(QIcon(icon))
+        self.skin.save()
+        return True
 
     # 创建淡入淡出动画
     def start_animation(self, start, end):
@@ -438,32 +512,68 @@ class Window(QWidget):
         self.animation.start()
         return self.animation
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        # 主窗口第一次绘制完成后，在空闲时创建播放列表窗口
+        if not self.list_scheduled:
+            self.list_scheduled = True
+            startup_trace.mark("first paint")
+            QTimer.singleShot(0, self.ensure_list)
+
+    def ensure_list(self):
+        """返回播放列表窗口，还没创建时立即创建（创建后会自动显示）"""
+        if self.list is None:
+            # 播放列表模块依赖较多（SQLite、进程池等），也推迟到这里再导入
+            with startup_trace.phase("import playlist"):
+                import playlist
+            with startup_trace.phase("PlayList.__init__"):
+                self.list = playlist.PlayList(self.geometry().x(), self.geometry().y(), self.geometry().width(),
+                                              self.geometry().height(), self)
+            # 播放列表建好后的下一轮事件循环即可交互，写出启动耗时记录
+            QTimer.singleShot(0, startup_trace.finish)
+        return self.list
+
     # 置顶与撤销置顶窗口
     def win_fixed(self):
         if self.windowFlags() & Qt.WindowStaysOnTopHint:
             self.setWindowFlags(self.windowFlags() & ~Qt.WindowStaysOnTopHint)
-            self.list.setWindowFlags(self.windowFlags() & ~Qt.WindowStaysOnTopHint)
+            if self.list is not None:
+                self.list.setWindowFlags(self.windowFlags() & ~Qt.WindowStaysOnTopHint)
 
         else:
             self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
-            self.list.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
+            if self.list is not None:
+                self.list.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
 
         self.show()  # 必须重新 show() 才能生效
-        self.list.show()
+        if self.list is not None:
+            self.list.show()
 
     # 窗口最小化
     def minimize_window(self):
         self.showMinimized()
-        self.list.showMinimized()
+        if self.list is not None:
+            self.list.showMinimized()
 
     # 关闭按钮,渐隐动画完成后关闭程序
     def exit_all(self):
+        self.skin.save()  # 保存皮肤图集，下次启动免去解码和圆角绘制
+        startup_trace.report_counters()  # 只在启用耗时记录时打印
+        if self.eq_window is not None:
+            self.eq_window.save()
+            self.eq_window.hide()
         self.anim = self.start_animation(1, 0)
-        self.anim = self.list.start_animation(1, 0)
+        if self.list is not None:
+            self.list.indexer.shutdown()  # 停止后台标签索引
+            self.anim = self.list.start_animation(1, 0)
         self.anim.finished.connect(sys.exit)
 
     # 创建播放列表窗口
     def musiclist(self):
+        if self.list is None:
+            # 第一次打开：创建时即渐显
+            self.ensure_list()
+            return
         if self.list.isVisible():
             self.list.start_animation(1, 0)
 
@@ -473,8 +583,29 @@ class Window(QWidget):
             self.list.start_animation(0, 1)
             self.list.show()
 
+    # 创建歌词窗口（多行滚动歌词，桌面歌词由其中的按钮打开）
+    def lyric_panel_win(self):
+        if self.lyric_panel is None:
+            from lyric_panel import LyricPanel
+            self.lyric_panel = LyricPanel(self)
+            anchor = self.list if self.list is not None and self.list.isVisible() else self
+            self.lyric_panel.move(anchor.geometry().x(), anchor.geometry().y() + anchor.geometry().height())
+            # 显示正在播放的歌曲的歌词
+            if self.list is not None:
+                self.lyric_panel.show_lyrics(self.list.lyrics, self.list.current_lyric_index)
+        self.lyric_panel.setVisible(not self.lyric_panel.isVisible())
+
     # 创建悬浮歌词窗口
     def lrc_win(self):
+        if self.lrc is None:
+            '''创建悬浮歌词框'''
+            self.lrc = lrcwin.LyricWindow()
+            anchor = self.list if self.list is not None else self
+            self.lrc.move(anchor.geometry().x() + (anchor.geometry().width() / 2) - self.lrc.geometry().width() / 2,
+                          anchor.geometry().y() + anchor.geometry().height())
+            # 显示正在播放的那一句
+            if self.list is not None and 0 <= self.list.current_lyric_index < len(self.list.lyrics):
+                self.lrc.lyric_label.setText(self.list.lyrics.texts[self.list.current_lyric_index])
         if self.lrc.isVisible():
             # self.lrc.start_animation(1, 0)
             self.lrc.hide()
@@ -483,6 +614,20 @@ class Window(QWidget):
         else:
             # self.lrc.start_animation(0, 1)
             self.lrc.show()
+
+    # 创建均衡器窗口
+    def eq_win(self):
+        if self.equalizer is None:
+            QMessageBox.information(self, "均衡器", "均衡器需要 numpy，请先安装：pip install numpy")
+            return
+        if self.eq_window is None:
+            from equalizer_window import EqualizerWindow
+            self.eq_window = EqualizerWindow(self.equalizer, self.player, self.skin, self.skin_layout)
+            # 放在主窗口下方（播放列表打开时放在播放列表下方）
+            anchor = self.list if self.list is not None and self.list.isVisible() else self
+            self.eq_window.move(anchor.geometry().x(), anchor.geometry().y() + anchor.geometry().height())
+        self.eq_window.setVisible(not self.eq_window.isVisible())
+
     # 当有对象被拖入窗口时触发此事件
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():  # 检查是否是 URL（文件）
@@ -494,27 +639,19 @@ class Window(QWidget):
     def dropEvent(self, event):
         urls = event.mimeData().urls()  # 获取所有拖放的文件URL
         if urls:
-            for url in urls:
-                file_path = url.toLocalFile()  # 转换为本地文件路径
-                if file_path.lower().endswith('.mp3'):  # 确保是MP3文件
-                    print(f"拖放的文件路径: {file_path}")
-                    self.add_playlist(file_path)
-                else:
-                    print(f"忽略非 MP3 文件: {file_path}")
+            paths = [url.toLocalFile() for url in urls]  # 转换为本地文件路径
+            # 拖入皮肤目录（含 Skin.xml）时切换皮肤
+            if len(paths) == 1 and os.path.isfile(os.path.join(paths[0], 'Skin.xml')):
+                self.switch_skin(paths[0])
+                return
+            # 文件和文件夹都交给播放列表窗口导入
+            self.ensure_list().import_paths(paths)
         else:
             event.ignore()
 
-    # 将文件路径加入播放列表文件
-    def add_playlist(self, file_path):
-        with open("./play_list.txt", 'a+') as f:
-            f.seek(0)  # 移动到文件开头读取
-            if file_path not in f.read():
-                f.write(file_path + '\n')
-                print("已添加")
-            else:
-                print("已存在")
-        self.list.load_music_folder()
-        self.list.update_playlist_display()
+    # 将文件路径批量加入播放列表（交给播放列表窗口统一写入存储）
+    def add_playlist(self, file_paths):
+        return self.ensure_list().add_playlist(file_paths)
 
     # 播放按钮，播放音乐
     def play_audio(self):
@@ -526,58 +663,45 @@ class Window(QWidget):
             self.player.play()
             self.btn_pause.setVisible(False)
 
-    # 水平裁切图像，并保存在列表中
-    def crop_image_into_four_horizontal(self, image_path):
-        # 加载原始图片
-        original_pixmap = QPixmap(image_path)
-
-        if original_pixmap.isNull():
-            print("图片加载失败，请检查路径")
-            return
-
-        # 获取原始图片的尺寸
-        width = original_pixmap.width()
-        height = original_pixmap.height()
-
-        # 计算每个分割部分的宽度
-        part_width = width // 4
-
-        # 创建一个列表用于存储裁剪后的图像
-        cropped_images = []
-
-        for i in range(4):
-            # 定义每个部分的矩形区域
-            rect = QRect(i * part_width, 0, part_width, height)
-
-            # 裁剪图片
-            cropped = original_pixmap.copy(rect)
-
-            # 将裁剪后的图像添加到列表中
-            cropped_images.append(cropped)
-        return cropped_images, part_width, height
-
     def update_slider_position(self, position):
-        """更新进度条位置"""
+        """更新进度条位置（滑块没移动一个像素时进度条不重绘，见 ImageSlider.sliderChange）"""
+        startup_trace.count("位置通知")
         if not self.progress_slider.isSliderDown():
             self.progress_slider.setValue(position)
-        # 更新当前时间显示
-        self.current_time_label.setText(self.format_time(position))
+        # 时间只显示到秒，跨过整秒才更新
+        second = position // 1000
+        if second != self.shown_second:
+            self.shown_second = second
+            startup_trace.count("时间标签更新")
+            self.current_time_label.setText(self.format_time(position))
+
     def set_slider_duration(self, duration):
         """设置进度条总长度"""
         self.progress_slider.setRange(0, duration)
+        self.set_notify_interval(self.NOTIFY_INTERVAL)
+
+    def set_notify_interval(self, interval=0):
+        """设置播放位置通知间隔；0 表示自动：通知再频繁，滑块也要这么久才移动一个像素"""
+        if not interval:
+            pixels = max(self.progress_slider.width() - self.progress_slider.handle_pixmap.width(), 1)
+            interval = self.player.duration() // pixels
+            interval = max([step for step in self.NOTIFY_STEPS if step <= interval] or [self.NOTIFY_STEPS[0]])
+        if interval != self.player.notifyInterval():
+            self.player.setNotifyInterval(int(interval))
         # # 更新总时间显示
         # self.total_time_label.setText(self.format_time(duration))
 
     def slider_pressed(self):
         """进度条按下事件"""
-        self.list.lyric_timer.stop()  # 暂停歌词更新
+        if self.list is not None:
+            self.list.lyric_timer.stop()  # 暂停歌词更新
 
     def slider_released(self):
         """进度条释放事件"""
         position = self.progress_slider.value()
         self.player.setPosition(position)
-        self.list.lyric_timer.start(100)  # 恢复歌词更新
-        self.list.update_lyrics()  # 立即更新歌词
+        if self.list is not None:
+            self.list.schedule_lyrics()  # 立即更新歌词并重新调度
 
     def increase_volume(self):
         self.current_volume = self.volume_slider.value()
@@ -597,7 +721,8 @@ class Window(QWidget):
     def handle_media_status(self, status):
         """处理媒体状态变化"""
         if status == QMediaPlayer.EndOfMedia:
-            self.list.play_next()
+            # 播放结束，切到已预读好的下一首
+            self.ensure_list().play_next()
         # elif status == QMediaPlayer.LoadedMedia:
         #     self.status_label.setText(f"已加载: {os.path.basename(self.current_playing_path)}")
         # elif status == QMediaPlayer.InvalidMedia:
@@ -611,11 +736,17 @@ class Window(QWidget):
             self.shuffle_label.setText("顺序播放")
         else:
             self.shuffle_label.setText("随机播放")
+        # 播放模式变了，重新选择并预读下一首
+        if self.list is not None:
+            self.list.prefetch_next()
 
 if __name__ == "__main__":
-    player = QApplication(sys.argv)
-    music = Window()
+    with startup_trace.phase("QApplication"):
+        player = QApplication(sys.argv)
+    with startup_trace.phase("Window.__init__"):
+        music = Window()
     # 设置图标
-    player.setWindowIcon(QIcon("./skin/Purple/TTPlayer.ico"))  # 替换为你的图标文件路径
-    music.show()
+    player.setWindowIcon(QIcon(music.skin_layout.image('player_window', 'icon') or ''))  # 图标取自皮肤
+    with startup_trace.phase("show"):
+        music.show()
     player.exec_()
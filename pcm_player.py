@@ -0,0 +1,401 @@
+import time
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtMultimedia import QAudio, QAudioDecoder, QAudioFormat, QAudioOutput, QMediaContent, QMediaPlayer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from equalizer import Equalizer, design_matrices
+
+
+def buffer_to_array(buffer):
+    """QAudioBuffer -> (帧数, 声道数) 的 float32 数组（-1 ~ 1），不支持的格式返回 None"""
+    fmt = buffer.format()
+    raw = buffer.constData().asstring(buffer.byteCount())
+    size, kind = fmt.sampleSize(), fmt.sampleType()
+    if kind == QAudioFormat.Float and size == 32:
+        samples = np.frombuffer(raw, np.float32)
+    elif kind == QAudioFormat.SignedInt and size == 16:
+        samples = np.frombuffer(raw, np.int16).astype(np.float32) / 32768
+    elif kind == QAudioFormat.SignedInt and size == 32:
+        samples = np.frombuffer(raw, np.int32).astype(np.float32) / 2147483648
+    elif kind == QAudioFormat.UnSignedInt and size == 8:
+        samples = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128
+    else:
+        return None
+    channels = max(fmt.channelCount(), 1)
+    return samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+
+
+class DesignSignals(QObject):
+    done = pyqtSignal(object, int, object)  # 增益, 采样率, 矩阵
+
+
+class DesignTask(QRunnable):
+    """在后台线程按新的增益重新计算均衡器矩阵（约 20 毫秒），不占用界面线程"""
+
+    def __init__(self, bands, gains, sample_rate):
+        super().__init__()
+        self.bands = bands
+        self.gains = gains
+        self.sample_rate = sample_rate
+        self.signals = DesignSignals()
+
+    def run(self):
+        self.signals.done.emit(self.gains, self.sample_rate,
+                               design_matrices(self.bands, self.gains, self.sample_rate))
+
+
+class PcmPlayer(QObject):
+    """解码 -> 均衡器 -> 音频输出 的播放器，提供 PlaybackEngine 用到的 QMediaPlayer 接口。
+
+    QMediaPlayer 无法在解码和输出之间插入处理，因此启用均衡器时改用它：
+    QAudioDecoder 解码到一个固定大小的环形缓冲区（16 位整数），只比播放位置超前几秒，
+    缓冲区满时不再取走解码结果，解码器随之暂停；播放时按块经过均衡器写入 QAudioOutput。
+    """
+
+    positionChanged = pyqtSignal('qint64')
+    durationChanged = pyqtSignal('qint64')
+    stateChanged = pyqtSignal(int)
+    mediaStatusChanged = pyqtSignal(int)
+    playbackRateChanged = pyqtSignal(float)
+    # 刚写入输出设备的样本（(帧数, 声道数) float32, 采样率），供频谱显示使用
+    samplesPlayed = pyqtSignal(object, int)
+
+    PUSH_INTERVAL = 20  # 向输出设备写数据的间隔（毫秒）
+    BUFFER_MS = 300  # 输出缓冲时长
+    RING_SECONDS = 10  # 解码环形缓冲区的时长（已播放的部分留着，小范围往回跳转不必重新解码）
+    DECODE_AHEAD = 5  # 解码超前播放位置的秒数
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        # settings 为界面上调节的 Equalizer，这里的 equalizer 保存本播放器自己的滤波器状态
+        self.settings = settings
+        self.equalizer = None
+        self.design_task = None  # 正在后台计算的矩阵，同一时间只有一个
+        self.media = QMediaContent()
+        self._state = QMediaPlayer.StoppedState
+        self._status = QMediaPlayer.NoMedia
+        self._volume = 100
+        self._notify_interval = 1000
+        self._last_notify = 0.0
+
+        self.decoder = QAudioDecoder(self)
+        self.decoder.bufferReady.connect(self._on_buffer)
+        self.decoder.finished.connect(self._on_decoded)
+        self.decoder.error.connect(self._on_error)
+        self.decoder.durationChanged.connect(self._on_duration)
+        self.format = None
+        self.ring = None  # 解码结果的环形缓冲区 (帧数, 声道数) int16，第 n 帧存放在 n % 长度 处
+        self.ring_start = 0  # 缓冲区中最早一帧的编号
+        self.frames = 0  # 已解码的帧数（缓冲区中最后一帧之后的编号）
+        self.decoded = False
+        self._duration = 0
+
+        self.output = None
+        self.device = None
+        self.read_frame = 0  # 下一次送入均衡器的位置
+        self.base_position = 0  # 本次启动输出时的播放位置（毫秒）
+        self.flushed = False
+
+        self.push_timer = QTimer(self)
+        self.push_timer.setInterval(self.PUSH_INTERVAL)
+        self.push_timer.timeout.connect(self._push)
+
+    # ---- 与 QMediaPlayer 相同的接口 ----
+    def setMedia(self, content):
+        self._stop_output()
+        self.decoder.stop()
+        self.media = content
+        self.ring = None
+        self.ring_start = 0
+        self.frames = 0
+        self.decoded = False
+        self.format = None
+        self.read_frame = 0
+        self.base_position = 0
+        self._set_duration(0)
+        self._set_state(QMediaPlayer.StoppedState)
+        path = content.canonicalUrl().toLocalFile()
+        if not path:
+            self._set_status(QMediaPlayer.NoMedia)
+            return
+        self._set_status(QMediaPlayer.LoadingMedia)
+        self.decoder.setSourceFilename(path)
+        self.decoder.start()
+
+    def currentMedia(self):
+        return self.media
+
+    def play(self):
+        if self._status in (QMediaPlayer.NoMedia, QMediaPlayer.InvalidMedia):
+            return
+        if self._status == QMediaPlayer.EndOfMedia:
+            self.setPosition(0)
+        self._set_state(QMediaPlayer.PlayingState)
+        if self.output is not None and self.output.state() == QAudio.SuspendedState:
+            self.output.resume()
+            self.push_timer.start()
+        elif self.format is not None:
+            self._start_output()
+
+    def pause(self):
+        if self._state == QMediaPlayer.PausedState or self._status in (QMediaPlayer.NoMedia, QMediaPlayer.InvalidMedia):
+            return
+        self._set_state(QMediaPlayer.PausedState)
+        self.push_timer.stop()
+        if self.device is not None:
+            self.output.suspend()
+
+    def stop(self):
+        self._stop_output()
+        self.read_frame = 0
+        self.base_position = 0
+        self._set_state(QMediaPlayer.StoppedState)
+        self.positionChanged.emit(0)
+
+    def state(self):
+        return self._state
+
+    def mediaStatus(self):
+        return self._status
+
+    def position(self):
+        if self.output is None or self.device is None:
+            return self.base_position
+        return self.base_position + self.output.processedUSecs() // 1000
+
+    def setPosition(self, position):
+        playing = self._state == QMediaPlayer.PlayingState
+        self._stop_output()
+        self.base_position = max(0, int(position))
+        if self.format is not None:
+            self._seek_frame(self._frame_at(self.base_position))
+        if self._status == QMediaPlayer.EndOfMedia:
+            self._set_status(QMediaPlayer.LoadedMedia)
+        if playing and self.format is not None:
+            self._start_output()
+        self.positionChanged.emit(self.base_position)
+
+    def duration(self):
+        return self._duration
+
+    def volume(self):
+        return self._volume
+
+    def setVolume(self, volume):
+        self._volume = max(0, min(100, int(volume)))
+        if self.output is not None:
+            self.output.setVolume(self._volume / 100)
+
+    def playbackRate(self):
+        return 1.0
+
+    def setPlaybackRate(self, rate):
+        # 变速需要重采样，这里不支持
+        pass
+
+    def notifyInterval(self):
+        return self._notify_interval
+
+    def setNotifyInterval(self, interval):
+        self._notify_interval = max(1, int(interval))
+
+    # ---- 解码 ----
+    def _on_buffer(self):
+        self._fill()
+
+    def _wants_data(self):
+        if self.format is None or self.read_frame > self.frames:
+            return True
+        return self.frames - self.read_frame < self.format[0] * self.DECODE_AHEAD
+
+    def _fill(self):
+        """缓冲区有空间时取走解码结果；不取走时解码器会停下来等待"""
+        while self.decoder.bufferAvailable() and self._wants_data():
+            self._store(self.decoder.read())
+
+    def _store(self, buffer):
+        samples = buffer_to_array(buffer)
+        if samples is None or not len(samples):
+            return
+        if self.format is None:
+            fmt = buffer.format()
+            self.format = (fmt.sampleRate(), samples.shape[1])
+            if self.equalizer is None:
+                # 第一次用时直接计算；之后换歌沿用已算好的矩阵，调节增益时在后台重新计算
+                self.equalizer = Equalizer(*self.format)
+                self.equalizer.set_gains(self.settings.gains)
+            self.ring = np.zeros((self.format[0] * self.RING_SECONDS, samples.shape[1]), np.int16)
+            # 载入完成前设置的播放位置
+            self.read_frame = self._frame_at(self.base_position)
+            self._set_status(QMediaPlayer.LoadedMedia)
+            if self._state == QMediaPlayer.PlayingState:
+                self._start_output()
+        if samples.shape[1] != self.ring.shape[1]:
+            return
+        capacity = len(self.ring)
+        end = self.frames + len(samples)
+        self.frames = end
+        if end <= self.read_frame - capacity:
+            # 向后跳转时跳过的部分，不必保存
+            return
+        data = (samples[-capacity:] * 32767).astype(np.int16)
+        offset = (end - len(data)) % capacity
+        first = min(len(data), capacity - offset)
+        self.ring[offset:offset + first] = data[:first]
+        self.ring[:len(data) - first] = data[first:]
+        self.ring_start = max(self.ring_start, end - capacity)
+
+    def _seek_frame(self, frame):
+        if frame < self.ring_start:
+            # 已经不在缓冲区里：QAudioDecoder 不支持跳转，只能从头重新解码，跳过目标之前的部分
+            self.decoder.stop()
+            self.frames = 0
+            self.ring_start = 0
+            self.decoded = False
+            self.decoder.start()
+        self.read_frame = frame
+        self._fill()
+
+    def _read(self, count):
+        """从缓冲区取出 count 帧，转成 float32"""
+        capacity = len(self.ring)
+        offset = self.read_frame % capacity
+        first = min(count, capacity - offset)
+        block = self.ring[offset:offset + first]
+        if count > first:
+            block = np.concatenate((block, self.ring[:count - first]))
+        self.read_frame += count
+        return block.astype(np.float32) / 32768
+
+    def _on_decoded(self):
+        self.decoded = True
+        if self.format is not None:
+            self._set_duration(self.frames * 1000 // self.format[0])
+        elif self._status == QMediaPlayer.LoadingMedia:
+            self._set_status(QMediaPlayer.InvalidMedia)
+
+    def _on_error(self, error):
+        print(f"解码失败：{self.decoder.errorString()}")
+        self._stop_output()
+        self._set_state(QMediaPlayer.StoppedState)
+        self._set_status(QMediaPlayer.InvalidMedia)
+
+    def _on_duration(self, duration):
+        if duration > 0 and not self.decoded:
+            self._set_duration(duration)
+
+    # ---- 输出 ----
+    def _frame_at(self, position):
+        return int(position * self.format[0] / 1000) if self.format else 0
+
+    def _start_output(self):
+        rate, channels = self.format
+        if self.output is None or self.output.format().sampleRate() != rate \
+                or self.output.format().channelCount() != channels:
+            fmt = QAudioFormat()
+            fmt.setSampleRate(rate)
+            fmt.setChannelCount(channels)
+            fmt.setSampleSize(16)
+            fmt.setSampleType(QAudioFormat.SignedInt)
+            fmt.setByteOrder(QAudioFormat.LittleEndian)
+            fmt.setCodec("audio/pcm")
+            if self.output is not None:
+                self.output.deleteLater()
+            self.output = QAudioOutput(fmt, self)
+            self.output.setBufferSize(rate * channels * 2 * self.BUFFER_MS // 1000)
+        self.output.setVolume(self._volume / 100)
+        # 跳转后的样本与之前不连续，清空滤波器状态
+        self.equalizer.configure(rate, channels)
+        self.flushed = False
+        self.base_position = self.read_frame * 1000 // rate
+        self.device = self.output.start()
+        self._set_status(QMediaPlayer.BufferedMedia)
+        self.push_timer.start()
+        self._push()
+
+    def _stop_output(self):
+        self.push_timer.stop()
+        if self.output is not None and self.device is not None:
+            self.base_position = self.position()
+            self.output.stop()
+        self.device = None
+
+    def _push(self):
+        if self.device is None:
+            return
+        rate, channels = self.format
+        # 同步界面调节的参数；增益变化时在后台重新计算矩阵，算好之前继续用旧的，
+        # 拖动滑块期间同一时间只算一次，算完再看增益是否又变了
+        settings = self.settings
+        if self.equalizer.gains != settings.gains and self.design_task is None:
+            self._start_design(list(settings.gains), rate)
+        if self.equalizer.preamp != settings.preamp:
+            self.equalizer.set_preamp(settings.preamp)
+
+        free = self.output.bytesFree() // (2 * channels)
+        if self.read_frame < self.ring_start:
+            # 解码数据来不及保存时被覆盖（不应发生），跳过这一段
+            self.read_frame = self.ring_start
+        count = min(free, self.frames - self.read_frame)
+        if count > 0:
+            # 增益全为 0 时矩阵就是恒等变换，仍然经过均衡器，开关效果时不会丢掉或错接样本
+            self._write(self.equalizer.process(self._read(count)), rate)
+            self._fill()
+        elif self.decoded and self.read_frame >= self.frames and not self.decoder.bufferAvailable():
+            if not self.flushed:
+                self.flushed = True
+                self._write(self.equalizer.flush(), rate)
+            # 输出缓冲全部播完才算结束
+            if self.output.bytesFree() >= self.output.bufferSize() \
+                    or self.output.state() == QAudio.IdleState:
+                self._finish()
+                return
+
+        now = time.monotonic()
+        if (now - self._last_notify) * 1000 >= self._notify_interval:
+            self._last_notify = now
+            self.positionChanged.emit(self.position())
+
+    def _start_design(self, gains, rate):
+        self.design_task = DesignTask(self.equalizer.bands, gains, rate)
+        self.design_task.signals.done.connect(self._on_designed)
+        QThreadPool.globalInstance().start(self.design_task)
+
+    def _on_designed(self, gains, rate, matrices):
+        self.design_task = None
+        # 期间换了采样率时丢弃，下次推送时重新计算
+        if self.equalizer is not None and self.equalizer.sample_rate == rate:
+            self.equalizer.set_matrices(gains, matrices)
+
+    def _write(self, samples, rate):
+        if not len(samples):
+            return
+        self.device.write((samples * 32767).astype(np.int16).tobytes())
+        self.samplesPlayed.emit(samples, rate)
+
+    def _finish(self):
+        position = self.position()
+        self._stop_output()
+        self.base_position = position
+        self._set_state(QMediaPlayer.StoppedState)
+        self._set_status(QMediaPlayer.EndOfMedia)
+
+    # ---- 状态 ----
+    def _set_state(self, state):
+        if state != self._state:
+            self._state = state
+            self.stateChanged.emit(int(state))
+
+    def _set_status(self, status):
+        if status != self._status:
+            self._status = status
+            self.mediaStatusChanged.emit(int(status))
+
+    def _set_duration(self, duration):
+        if duration != self._duration:
+            self._duration = duration
+            self.durationChanged.emit(duration)
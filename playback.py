@@ -0,0 +1,329 @@
+import sys
+import time
+from PyQt5.QtCore import QObject, QTimer, QUrl, Qt, pyqtSignal
+from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+
+
+class PlaybackEngine(QObject):
+    """双播放器引擎：一个播放当前曲目，另一个提前载入下一首，结束前无缝切换或交叉淡入淡出。
+
+    对外提供与 QMediaPlayer 相同的常用接口和信号，信号只从当前曲目的播放器转发。
+    """
+
+    positionChanged = pyqtSignal('qint64')
+    durationChanged = pyqtSignal('qint64')
+    stateChanged = pyqtSignal(int)
+    mediaStatusChanged = pyqtSignal(int)
+    playbackRateChanged = pyqtSignal(float)
+    # 自动切换到了预载的下一首（参数为音频路径）
+    advanced = pyqtSignal(str)
+    # 测得的切歌间隙（毫秒，负数表示两首重叠）
+    transitionMeasured = pyqtSignal(float)
+    # 开关均衡器后换了一组播放器（频谱显示需要重新接入）
+    playersChanged = pyqtSignal()
+
+    # 在距离切换点多远时开始精确定时（需大于 positionChanged 的通知间隔）
+    SWITCH_LEAD = 1500
+    FADE_STEP = 30
+
+    def __init__(self, overlap=0, parent=None):
+        super().__init__(parent)
+        self.equalizer = None
+        self.players = [self._create_player(), self._create_player()]
+        self.active = 0
+        self.overlap = overlap  # 交叉淡入淡出的重叠时长（毫秒），0 表示无缝衔接
+        self.volume_level = 100
+        self.preloaded_path = None
+        self._pending_preload = None
+        self.last_gap = None
+
+        # 淡入淡出和切换定时器
+        self.outgoing = None
+        self.fade_started = 0.0
+        self.fade_timer = QTimer(self)
+        self.fade_timer.setInterval(self.FADE_STEP)
+        self.fade_timer.timeout.connect(self._fade_step)
+        self.switch_timer = QTimer(self)
+        self.switch_timer.setSingleShot(True)
+        self.switch_timer.setTimerType(Qt.PreciseTimer)
+        self.switch_timer.timeout.connect(self.begin_transition)
+
+        # 测量切歌间隙用的时间点
+        self._measuring = False
+        self._old_end = None
+        self._new_start = None
+
+    def _create_player(self):
+        if self.equalizer is None:
+            player = QMediaPlayer(self)
+        else:
+            from pcm_player import PcmPlayer
+            player = PcmPlayer(self.equalizer, self)
+        player.positionChanged.connect(lambda position, p=player: self._on_position(p, position))
+        player.durationChanged.connect(lambda duration, p=player: self._forward(p, self.durationChanged, duration))
+        player.stateChanged.connect(lambda state, p=player: self._forward(p, self.stateChanged, int(state)))
+        player.mediaStatusChanged.connect(lambda status, p=player: self._on_media_status(p, status))
+        player.playbackRateChanged.connect(lambda rate, p=player: self._forward(p, self.playbackRateChanged, rate))
+        return player
+
+    @property
+    def player(self):
+        """当前曲目的播放器"""
+        return self.players[self.active]
+
+    @property
+    def standby(self):
+        """用来预载下一首的播放器"""
+        return self.players[1 - self.active]
+
+    # ---- 与 QMediaPlayer 相同的接口 ----
+    def setMedia(self, content):
+        path = content.canonicalUrl().toLocalFile()
+        if path and path == self.preloaded_path and self.outgoing is None \
+                and self.standby.mediaStatus() in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia):
+            # 要播放的正是预载好的那一首，直接交换播放器
+            self.switch_timer.stop()
+            old = self.player
+            self._swap()
+            old.stop()
+            self._announce()
+            return
+        self.switch_timer.stop()
+        self._finish_fade()
+        self._measuring = False
+        self._old_end = self._new_start = None
+        self.player.setMedia(content)
+
+    def play(self):
+        self.player.play()
+
+    def pause(self):
+        self.switch_timer.stop()
+        self._finish_fade()
+        self.player.pause()
+
+    def stop(self):
+        self.switch_timer.stop()
+        self._finish_fade()
+        self.player.stop()
+
+    def state(self):
+        return self.player.state()
+
+    def mediaStatus(self):
+        return self.player.mediaStatus()
+
+    def position(self):
+        return self.player.position()
+
+    def setPosition(self, position):
+        self.player.setPosition(position)
+
+    def duration(self):
+        return self.player.duration()
+
+    def volume(self):
+        return self.volume_level
+
+    def setVolume(self, volume):
+        self.volume_level = volume
+        if self.outgoing is None:
+            for player in self.players:
+                player.setVolume(volume)
+
+    def playbackRate(self):
+        return self.player.playbackRate()
+
+    def setPlaybackRate(self, rate):
+        for player in self.players:
+            player.setPlaybackRate(rate)
+
+    def notifyInterval(self):
+        return self.player.notifyInterval()
+
+    def setNotifyInterval(self, interval):
+        for player in self.players:
+            player.setNotifyInterval(interval)
+
+    # ---- 均衡器 ----
+    def set_equalizer(self, equalizer):
+        """传入 Equalizer 启用均衡器，传入 None 关闭。
+
+        QMediaPlayer 无法处理解码后的音频，启用时换成 PcmPlayer（自行解码后经过均衡器输出），
+        关闭时换回 QMediaPlayer；当前曲目、播放位置和状态保持不变。
+        """
+        if (equalizer is None) == (self.equalizer is None):
+            self.equalizer = equalizer
+            for player in self.players:
+                if hasattr(player, "settings"):
+                    player.settings = equalizer
+            return
+        current = self.player
+        path = current.currentMedia().canonicalUrl().toLocalFile()
+        position = current.position()
+        state = current.state()
+        preloaded = self._pending_preload or self.preloaded_path
+        interval = current.notifyInterval()
+
+        self.switch_timer.stop()
+        self._finish_fade()
+        self._measuring = False
+        self._old_end = self._new_start = None
+        for player in self.players:
+            player.stop()
+            player.deleteLater()
+        self.equalizer = equalizer
+        self.players = [self._create_player(), self._create_player()]
+        self.active = 0
+        self.preloaded_path = None
+        for player in self.players:
+            player.setVolume(self.volume_level)
+            player.setNotifyInterval(interval)
+        self.playersChanged.emit()
+
+        if path:
+            self.player.setMedia(QMediaContent(QUrl.fromLocalFile(path)))
+            if position:
+                self.player.setPosition(position)
+            if state == QMediaPlayer.PlayingState:
+                self.player.play()
+            elif state == QMediaPlayer.PausedState:
+                self.player.pause()
+        if preloaded:
+            self.preload(preloaded)
+
+    # ---- 预载与切换 ----
+    def set_overlap(self, overlap):
+        self.overlap = max(0, int(overlap))
+
+    def preload(self, path):
+        """把下一首载入备用播放器；正在淡出时等淡出结束再载入"""
+        if path == self.preloaded_path:
+            return
+        if self.outgoing is not None:
+            self._pending_preload = path
+            return
+        self.preloaded_path = path
+        self.standby.setMedia(QMediaContent(QUrl.fromLocalFile(path)) if path else QMediaContent())
+
+    def begin_transition(self):
+        """启动预载的下一首，当前曲目在重叠时间内淡出"""
+        if self.preloaded_path is None or self.outgoing is not None:
+            return
+        self.switch_timer.stop()
+        old = self.player
+        self._swap()
+        self.player.setVolume(0 if self.overlap else self.volume_level)
+        self.player.play()
+        self._measuring = True
+        self._new_start = None
+        self.outgoing = old
+        self.fade_started = time.monotonic()
+        if self.overlap:
+            self.fade_timer.start()
+        else:
+            self._finish_fade()
+        # 先通知播放列表切换了曲目，再同步时长和位置
+        self.advanced.emit(self.player.currentMedia().canonicalUrl().toLocalFile())
+        self._announce()
+
+    def _swap(self):
+        self.active = 1 - self.active
+        self.preloaded_path = None
+
+    def _announce(self):
+        """切换后把新播放器的状态同步给界面"""
+        self.durationChanged.emit(self.player.duration())
+        self.positionChanged.emit(self.player.position())
+        self.stateChanged.emit(int(self.player.state()))
+
+    def _fade_step(self):
+        progress = min((time.monotonic() - self.fade_started) * 1000 / self.overlap, 1.0)
+        self.player.setVolume(int(self.volume_level * progress))
+        if self.outgoing is not None:
+            self.outgoing.setVolume(int(self.volume_level * (1 - progress)))
+        if progress >= 1.0:
+            self._finish_fade()
+
+    def _finish_fade(self):
+        self.fade_timer.stop()
+        old, self.outgoing = self.outgoing, None
+        if old is None:
+            return
+        if self._old_end is None:
+            self._old_end = time.monotonic()
+        old.stop()
+        for player in self.players:
+            player.setVolume(self.volume_level)
+        self._measure()
+        if self._pending_preload is not None:
+            path, self._pending_preload = self._pending_preload, None
+            self.preload(path)
+
+    # ---- 信号处理 ----
+    def _forward(self, player, signal, value):
+        if player is self.player:
+            signal.emit(value)
+
+    def _on_position(self, player, position):
+        if player is not self.player:
+            return
+        if self._measuring and self._new_start is None and position > 0:
+            # 新曲目实际开始发声的时刻 = 当前时刻 - 已播放时长
+            self._new_start = time.monotonic() - position / 1000.0 / (player.playbackRate() or 1.0)
+            self._measure()
+        self.positionChanged.emit(position)
+
+        # 接近结尾时，精确设定切换时刻
+        duration = player.duration()
+        if self.preloaded_path is None or self.outgoing is not None or duration <= 0 \
+                or player.state() != QMediaPlayer.PlayingState:
+            return
+        start_at = (duration - position - self.overlap) / (player.playbackRate() or 1.0)
+        if start_at <= self.SWITCH_LEAD:
+            self.switch_timer.start(max(int(start_at), 0))
+
+    def _on_media_status(self, player, status):
+        if player is self.outgoing and status == QMediaPlayer.EndOfMedia:
+            self._old_end = time.monotonic()
+            return
+        if player is not self.player:
+            return
+        if status == QMediaPlayer.EndOfMedia:
+            self._old_end = time.monotonic()
+            if self.preloaded_path is not None:
+                # 定时器没赶上，立即切换，不把结束状态转发给界面
+                self.begin_transition()
+                return
+        self.mediaStatusChanged.emit(int(status))
+
+    def _measure(self):
+        if self._old_end is None or self._new_start is None:
+            return
+        self.last_gap = (self._new_start - self._old_end) * 1000
+        self._measuring = False
+        self._old_end = self._new_start = None
+        self.transitionMeasured.emit(self.last_gap)
+
+
+if __name__ == "__main__":
+    # 切歌间隙测试：python playback.py a.mp3 b.mp3 [重叠毫秒]
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)
+    first, second = sys.argv[1], sys.argv[2]
+    engine = PlaybackEngine(int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    engine.setMedia(QMediaContent(QUrl.fromLocalFile(first)))
+
+    def start():
+        # 直接跳到第一首结尾前 3 秒，节省测试时间
+        engine.setPosition(max(engine.duration() - 3000, 0))
+        engine.play()
+        engine.preload(second)
+
+    engine.durationChanged.connect(lambda duration: duration > 0 and engine.state() != QMediaPlayer.PlayingState
+                                   and start())
+    engine.transitionMeasured.connect(lambda gap: print(f"切歌间隙: {gap:.1f} ms"))
+    engine.transitionMeasured.connect(lambda gap: QTimer.singleShot(500, app.quit))
+    QTimer.singleShot(20000, app.quit)
+    app.exec_()
@@ -1,9 +1,26 @@
-import sys, os, random
-from PyQt5.QtWidgets import QApplication, QWidget, QPushButton, QListWidgetItem, QListWidget, QShortcut
-from PyQt5 import uic
-from PyQt5.QtCore import Qt, pyqtSignal, QEvent, pyqtSlot, QPropertyAnimation, QUrl, QRect, QTimer
-from PyQt5.QtGui import QIcon, QPixmap, QPainter, QPainterPath, QPalette, QBrush, QKeySequence
-from PyQt5.QtMultimedia import QMediaPlaylist, QMediaContent
+import sys, os
+from collections import deque
+from bisect import bisect_right
+from PyQt5.QtWidgets import QWidget, QPushButton, QListView, QShortcut, QLabel, QProgressBar, QLineEdit
+from PyQt5.QtCore import Qt, pyqtSignal, QEvent, pyqtSlot, QPropertyAnimation, QUrl, QTimer
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtMultimedia import QMediaPlayer, QMediaPlaylist, QMediaContent
+
+from playlist_store import PlaylistStore
+from playlist_model import PlaylistModel, FilteredPlaylistModel, PlaylistDelegate
+from lyrics import Lyrics, LyricCache
+from prefetch import Prefetcher
+from library_import import LibraryImporter, is_audio_file
+from metadata import MetadataCache, MetadataIndexer
+from library_watcher import LibraryWatcher
+from search_index import SearchIndex
+from lyric_render import PRERENDER_LINES
+from shuffle import ShuffleOrder
+from ui_cache import load_ui
+import startup_trace
+
+# 搜索索引每次空闲时处理的歌曲数
+SEARCH_BATCH = 2000
 
 class PlayList(QWidget):
     def __init__(self, x=255, y=255, width=2, height=0, first=None):
@@ -20,6 +37,22 @@ class PlayList(QWidget):
         # 随机播放模式
         # self.shuffle_mode = True
         self.current_index = 0
+        # 播放列表存储（SQLite + 内存索引）
+        with startup_trace.phase("PlaylistStore"):
+            self.store = PlaylistStore()
+        self.playlist = self.store.paths
+        # 标签/时长缓存，启动时即可显示上次索引的结果
+        with startup_trace.phase("MetadataCache"):
+            self.metadata_cache = MetadataCache()
+        # 已解析歌词缓存
+        with startup_trace.phase("LyricCache"):
+            self.lyric_cache = LyricCache()
+        # 下一首歌曲的后台预读
+        self.prefetcher = Prefetcher(self.lyric_cache, self)
+        self.next_index = None
+        self.next_path = None
+        # 随机播放顺序（每轮不重复，带前进/后退历史）
+        self.shuffle = ShuffleOrder(self.playlist)
 
         # 加载ui
         self.init_ui()
@@ -38,38 +71,49 @@ class PlayList(QWidget):
             self.dragging = False
 
     def init_ui(self):
-        self.ui = uic.loadUi("./Designer_ui/list.ui", self)
+        with startup_trace.phase("load_ui list.ui"):
+            self.ui = load_ui("./Designer_ui/list.ui", self)
         # 去掉标题栏
         self.setWindowFlags(Qt.FramelessWindowHint)
-        self.lyrics = []
+        self.lyrics = Lyrics()
+        self.lyric_times = self.lyrics.times  # 有序时间戳，用于二分查找
         self.current_lyric_index = 0
+        # 播放列表数据模型，视图只绘制可见行
+        self.model = PlaylistModel(self.metadata_cache, self)
+        self.song_list.setModel(self.model)
+        self.delegate = PlaylistDelegate(self.song_list)
+        self.song_list.setItemDelegate(self.delegate)
+        self.song_list.setUniformItemSizes(True)  # 行高一致，滚动时不必逐行测量
+        self.song_list.setLayoutMode(QListView.Batched)
+        # 搜索结果模型，搜索框有内容时视图切换到它
+        self.filter_model = FilteredPlaylistModel(self.model, self)
 
         # 播放列表界面透明显示
         self.song_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: transparent;
                 border: none;
             }
-            QListWidget::item {
+            QListView::item {
                 background-color: transparent;
                 color: white; /* 设置文字颜色 */
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: rgba(100, 100, 100, 100); /* 半透明选中项 */
             }
         """)
-        # 加载主窗口背景图
-        self.background_path = "./skin/Purple/playlist_skin.bmp"
-        pixmap = QPixmap(self.background_path)
-        pixmap = self.round_pixmap(pixmap, 8)  # 一行完成裁切并赋值
-
-        # 设置窗口大小为图片大小
-        self.setFixedSize(pixmap.width(), pixmap.height())
-
-        # 或者保持原图大小，居中/左上对齐显示
-        palette = QPalette()
-        palette.setBrush(QPalette.Window, QBrush(pixmap))  # 原图大小
-        self.setPalette(palette)
+        # 按皮肤设置背景、关闭按钮、列表位置和配色
+        self.skin_applied = {}
+        self.close.setStyleSheet("""
+                  QPushButton {
+                      border: none;
+                      padding: 0px;
+                      margin: 0px;
+                      background: transparent;
+                  }
+              """)
+        with startup_trace.phase("PlayList.apply_skin"):
+            self.apply_skin(self.first.skin_layout)
         self.setAutoFillBackground(True)
 
         # 设置窗口为无边框
@@ -82,34 +126,20 @@ class PlayList(QWidget):
         self.start_animation(0, 1)
 
         # 自动加载歌词列表
-        self.load_music_folder()
-
-        # 按钮组渲染
-        btn = {
-            self.close: './skin/Purple/close.bmp',
-
-        }
-        for key in btn:
-            self.temp = self.crop_image_into_four_horizontal(btn[key])
-            # 将 QPixmap 设置给 QPushButton
-            icon = QIcon(self.round_pixmap(self.temp[0][0], 3))
-            # icon = round_pixmap(icon,3)
-            key.setIcon(icon)
-            # 设置图标大小为按钮大小
-            key.setIconSize(key.size())
-            key.setStyleSheet("""
-                      QPushButton {
-                          border: none;
-                          padding: 0px;
-                          margin: 0px;
-                          background: transparent;
-                      }
-                  """)
-
-        # 定时器
+        with startup_trace.phase("load_music_folder", tracks=len(self.playlist)):
+            self.load_music_folder()
+
+        # 歌词定时器：单次触发，每次都对准下一句歌词的时间点重新设定
+        self.lyric_lead = 30  # 提前量（毫秒），抵消定时器和播放位置之间的误差
         self.lyric_timer = QTimer()
-        self.lyric_timer.timeout.connect(self.update_lyrics)
-        self.lyric_timer.start(1500)  # 每100ms检查一次歌词
+        self.lyric_timer.setSingleShot(True)
+        self.lyric_timer.setTimerType(Qt.PreciseTimer)
+        self.lyric_timer.timeout.connect(self.schedule_lyrics)
+        # 播放位置、播放状态、播放速率变化时重新计算下一次触发时间
+        self.first.player.positionChanged.connect(lambda position: self.schedule_lyrics())
+        self.first.player.stateChanged.connect(lambda state: self.schedule_lyrics())
+        self.first.player.playbackRateChanged.connect(lambda rate: self.schedule_lyrics())
+        self.first.player.advanced.connect(self.on_track_advanced)
 
         # 快捷键
         self.space_shortcut = QShortcut(QKeySequence(Qt.Key_Space), self)
@@ -121,41 +151,112 @@ class PlayList(QWidget):
         self.down_shortcut = QShortcut(QKeySequence(Qt.Key_Left), self)
         self.down_shortcut.activated.connect(self.play_preview)
 
+        # 搜索框：输入时即时过滤播放列表
+        self.search_box = QLineEdit(self)
+        self.search_box.setGeometry(15, 27, 110, 18)
+        self.search_box.setPlaceholderText("搜索歌曲/歌手")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setStyleSheet("color: #ffffff; background: transparent; border: 1px solid #9370DB;"
+                                      "font-size: 12px;font-family: PingFang SC;")
+        self.search_box.textChanged.connect(self.apply_filter)
+        # 搜索索引在空闲时分批建立，不阻塞启动
+        self.search_index = SearchIndex()
+        self.search_queue = deque()
+        self.search_timer = QTimer(self)
+        self.search_timer.timeout.connect(self.build_search_index)
+        self.index_for_search(self.playlist)
+
+        # 文件夹导入进度（平时隐藏）
+        self.import_label = QLabel("", self)
+        self.import_label.setGeometry(130, 27, 100, 18)
+        self.import_label.setStyleSheet("color: #ffffff; font-size: 12px;font-family: PingFang SC;")
+        self.import_progress = QProgressBar(self)
+        self.import_progress.setGeometry(15, 46, 270, 3)
+        self.import_progress.setRange(0, 0)  # 总数未知，显示忙碌状态
+        self.import_progress.setTextVisible(False)
+        self.import_cancel = QPushButton("取消", self)
+        self.import_cancel.setGeometry(235, 26, 50, 20)
+        self.import_cancel.setStyleSheet("color: #ffffff; background: transparent; border: 1px solid #9370DB;")
+        self.show_import_progress(False)
+
+        # 后台读取标签和时长，索引完成后刷新列表
+        self.indexer = MetadataIndexer(self.metadata_cache, self)
+        self.indexer.indexed.connect(self.on_metadata_indexed)
+        self.first.player.durationChanged.connect(self.remember_duration)
+        # 启动完成后再检查整个列表，只有新增或修改过的文件才会被读取
+        QTimer.singleShot(0, lambda: self.indexer.index(list(self.playlist)))
+
+        # 后台文件夹导入
+        self.importer = LibraryImporter(self)
+        self.importer.batchFound.connect(self.add_playlist)
+        self.importer.foldersScanned.connect(self.remember_folders)
+        self.importer.progress.connect(lambda found: self.import_label.setText(f"正在导入… 已找到 {found} 首"))
+        self.importer.finished.connect(self.import_finished)
+        self.importing_roots = []  # 正在导入、导入完成后才保存的根目录
+
+        # 监视媒体库目录，文件增删时只重新扫描变化的目录
+        self.library_watcher = LibraryWatcher(parent=self)
+        self.library_watcher.filesAdded.connect(self.add_playlist)
+        self.library_watcher.filesRemoved.connect(self.remove_playlist)
+        self.library_watcher.foldersAdded.connect(self.importer.start)
+        self.library_watcher.foldersRemoved.connect(self.store.remove_folders)
+        QTimer.singleShot(0, self.watch_library)
+
         # 连接信号和槽
         self.ui.close.clicked.connect(self.exit_all)
-        self.ui.song_list.itemDoubleClicked.connect(self.select_song)
+        self.ui.song_list.doubleClicked.connect(self.select_song)
+        self.import_cancel.clicked.connect(self.importer.cancel)
 
         self.show()
 
-    # 将同级目录下的play_list.txt文件里的歌曲地址读进self.playlist列表中
+    # 将播放列表存储中的歌曲地址读进self.playlist列表中
     def load_music_folder(self):
-        try:
-            with open("./play_list.txt", 'r', encoding='utf-8') as f:
-                temp_playlist = f.read().splitlines()
-            self.playlist = temp_playlist
-            # 更新播放列表显示
-            self.update_playlist_display()
-
-        except Exception as e:
-            print(f"加载失败：{e}")  # 打印具体错误
-
-    def update_playlist_display(self):
-        """更新播放列表显示"""
-        # self.sync_playlist_to_ui()
-
-        self.song_list.clear()
-        for path in self.playlist:
-            # 添加音乐文件到self.all_playlist中
-            self.first.all_playlist.addMedia(QMediaContent(QUrl.fromLocalFile(path)))
-            # 提取文件名（不含后缀）
-            file_name = os.path.basename(path)  # 例如："歌曲1.mp3"
-            name_without_ext = os.path.splitext(file_name)[0]  # 例如："歌曲1"
-            # 创建列表项并设置居中对齐
-            item = QListWidgetItem(name_without_ext)
-            item.setTextAlignment(Qt.AlignCenter)  # 关键：设置文本居中
-
-            self.song_list.addItem(item)  # 添加带对齐属性的条目
+        self.playlist = self.store.paths
+        # 更新播放列表显示
+        self.update_playlist_display()
 
+    def update_playlist_display(self, added=None, removed=None):
+        """增量更新播放列表显示，只追加/删除变化的行，并保持 all_playlist 与列表一一对应"""
+        if added is None and removed is None:
+            # 未指明变化时，与当前显示的内容做一次差异比较
+            current = set(self.playlist)
+            shown = set(self.model.paths)
+            removed = [path for path in self.model.paths if path not in current]
+            added = [path for path in self.playlist if path not in shown]
+
+        if removed:
+            self.remove_playlist_rows(removed)
+        if added:
+            self.append_playlist_rows(added)
+
+    def append_playlist_rows(self, paths):
+        """在列表末尾追加新行"""
+        # 添加音乐文件到self.all_playlist中（一次批量添加）
+        self.first.all_playlist.addMedia([QMediaContent(QUrl.fromLocalFile(path)) for path in paths])
+        # 显示名由模型在绘制时生成
+        self.model.append(paths)
+
+    def remove_playlist_rows(self, paths):
+        """删除指定歌曲对应的行"""
+        rows = sorted(row for row in map(self.model.row_of, set(paths)) if row >= 0)
+        # 倒序删除，避免行号错位
+        for row in reversed(rows):
+            self.first.all_playlist.removeMedia(row)
+        self.model.remove_rows(rows)
+        # 当前播放位置前面的行被删除时，索引跟着前移
+        self.current_index -= sum(1 for row in rows if row < self.current_index)
+
+    def apply_skin(self, layout):
+        """按皮肤描述设置播放列表窗口；切换皮肤时只更换变化了的图片"""
+        skin = self.first.skin
+        skin.apply_background(self, layout, 'playlist_window', self.skin_applied)
+        skin.apply_icon(self.close, layout, 'playlist_window', 'close', self.skin_applied)
+
+        rect = layout.place('playlist_window', 'playlist')
+        if rect:
+            self.song_list.setGeometry(*rect)
+        self.delegate.apply_skin(layout)
+        self.song_list.viewport().update()
 
     # 创建淡入淡出动画
     def start_animation(self, start, end):
@@ -182,182 +283,290 @@ class PlayList(QWidget):
     def dropEvent(self, event):
         urls = event.mimeData().urls()  # 获取所有拖放的文件URL
         if urls:
-            for url in urls:
-                file_path = url.toLocalFile()  # 转换为本地文件路径
-                if file_path.lower().endswith('.mp3'):  # 确保是MP3文件
-                    print(f"拖放的文件路径: {file_path}")
-                    self.add_playlist(file_path)
-                else:
-                    print(f"忽略非 MP3 文件: {file_path}")
+            self.import_paths([url.toLocalFile() for url in urls])  # 转换为本地文件路径
         else:
             event.ignore()
 
-    # 将文件路径加入播放列表文件
-    def add_playlist(self, file_path):
-        with open("./play_list.txt", 'a+') as f:
-            f.seek(0)  # 移动到文件开头读取
-            if file_path not in f.read():
-                f.write(file_path + '\n')
-                print("已添加")
+    def import_paths(self, paths):
+        """导入拖入的文件和文件夹：文件直接加入，文件夹交给后台线程递归扫描"""
+        file_paths = []
+        folders = []
+        for path in paths:
+            if os.path.isdir(path):
+                print(f"拖放的文件夹: {path}")
+                folders.append(path)
+            elif is_audio_file(path):  # 确保是支持的音频格式
+                print(f"拖放的文件路径: {path}")
+                file_paths.append(path)
             else:
-                print("已存在")
-        self.load_music_folder()
-        self.update_playlist_display()
+                print(f"忽略不支持的文件: {path}")
+        if file_paths:
+            self.add_playlist(file_paths)
+        if folders:
+            # 根目录在导入完成后才保存；取消导入时不保存，下次启动不会在后台接着导入
+            self.importing_roots.extend(folder for folder in folders if folder not in self.store.roots)
+            self.library_watcher.add_roots(folders)
+            self.import_label.setText("正在导入…")
+            self.show_import_progress(True)
+            self.importer.start(folders)
+
+    def show_import_progress(self, visible):
+        self.import_label.setVisible(visible)
+        self.import_progress.setVisible(visible)
+        self.import_cancel.setVisible(visible)
+
+    def import_finished(self, found, cancelled):
+        """文件夹导入结束"""
+        self.show_import_progress(False)
+        roots, self.importing_roots = self.importing_roots, []
+        if cancelled:
+            self.store.remove_folders(self.library_watcher.remove_roots(roots))
+        else:
+            self.store.add_roots(roots)
+        print(f"导入{'已取消' if cancelled else '完成'}，共找到 {found} 首")
+
+    def remember_folders(self, folders):
+        """导入时扫描过的目录都记下来并监视，没有歌曲的目录下次也不会被当成新目录重新导入"""
+        self.store.add_folders(folders)
+        self.library_watcher.watch_folders(folders)
+
+    # 将文件路径批量加入播放列表存储
+    def add_playlist(self, file_paths):
+        added = self.store.add_many(file_paths)
+        print(f"已添加 {len(added)} 首，已存在 {len(file_paths) - len(added)} 首")
+        if added:
+            self.update_playlist_display(added=added)
+            self.shuffle.add(added)
+            self.indexer.index(added)
+            self.library_watcher.track(added)
+            self.index_for_search(added)
+        return added
+
+    def remove_playlist(self, file_paths):
+        """从播放列表中移除歌曲（例如文件已被删除）"""
+        removed = self.store.remove_many(file_paths)
+        print(f"已移除 {len(removed)} 首")
+        if removed:
+            self.update_playlist_display(removed=removed)
+            self.shuffle.remove(removed)
+            for path in removed:
+                self.search_index.remove(path)
+            self.apply_filter()
+        return removed
+
+    def watch_library(self):
+        """开始监视已保存的媒体库根目录，并核对程序关闭期间的变化"""
+        self.library_watcher.add_roots(self.store.roots)
+        self.library_watcher.watch_folders(self.store.folders)
+        self.library_watcher.track(self.playlist)
+        self.library_watcher.rescan_all()
+
+    def on_metadata_indexed(self, paths):
+        """标签读取完成：刷新显示，并用新标签更新搜索索引"""
+        self.model.refresh()
+        self.filter_model.refresh()
+        self.index_for_search(paths)
+
+    def index_for_search(self, paths):
+        """把歌曲排进搜索索引的队列，空闲时分批加入"""
+        self.search_queue.extend(paths)
+        if not self.search_timer.isActive():
+            self.search_timer.start(0)
+
+    def build_search_index(self):
+        """每次只处理一批歌曲的文件名、标题、歌手，两批之间让出事件循环"""
+        added = 0
+        while self.search_queue and added < SEARCH_BATCH:
+            path = self.search_queue.popleft()
+            added += 1
+            if path not in self.store:
+                continue
+            info = self.metadata_cache.get(path)
+            title, artist = (info[0], info[1]) if info else (None, None)
+            self.search_index.add(path, os.path.splitext(os.path.basename(path))[0], title, artist)
+        remaining = self.search_index.build(SEARCH_BATCH)
+        if added and self.search_box.text():
+            self.apply_filter()
+        if not self.search_queue and remaining == 0:
+            self.search_timer.stop()
+
+    def apply_filter(self):
+        """按搜索框内容过滤播放列表；搜索框为空时显示完整列表"""
+        paths = self.search_index.search(self.search_box.text())
+        if paths is None:
+            if self.song_list.model() is not self.model:
+                self.song_list.setModel(self.model)
+                self.filter_model.reset_paths([])
+                self.set_current_row(self.current_index)
+            return
+        self.filter_model.reset_paths(paths)
+        if self.song_list.model() is not self.filter_model:
+            self.song_list.setModel(self.filter_model)
+        self.set_current_row(self.current_index)
+
+    def remember_duration(self, duration):
+        """把播放时得知的时长记入缓存"""
+        if duration > 0 and 0 <= self.current_index < len(self.playlist):
+            if self.metadata_cache.set_duration(self.playlist[self.current_index], duration):
+                self.model.refresh_rows([self.current_index])
+                self.filter_model.refresh()
+
+    def select_song(self, index=None):
+        model = self.song_list.model()
+        if model is self.filter_model:
+            self.play_index(model.source_row(index.row()))
+        else:
+            self.play_index(index.row())
 
-    # 定义圆角函数（只需写一次）
-    def round_pixmap(self, pixmap, radius):
-        rounded = QPixmap(pixmap.size())
-        rounded.fill(Qt.transparent)
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.setRenderHint(QPainter.SmoothPixmapTransform)
-
-        # 直接传 x, y, w, h
-        path = QPainterPath()
-        rect = pixmap.rect()
-        path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), radius, radius)
-        painter.setClipPath(path)
-
-        painter.drawPixmap(0, 0, pixmap)
-        painter.end()
-        return rounded
-
-    def select_song(self, item=None):
-        self.current_index = self.song_list.row(item)
-        self.first.player.setMedia(QMediaContent(QUrl.fromLocalFile(self.playlist[self.current_index])))
+    def play_index(self, index):
+        """切换到指定歌曲并播放，然后在后台预读下一首"""
+        if not self.playlist:
+            return
+        self.current_index = index % len(self.playlist)
+        path = self.playlist[self.current_index]
+        self.first.player.setMedia(QMediaContent(QUrl.fromLocalFile(path)))
         # self.first.volume_slider.setValue(min(self.first.volume_slider.current_volume, 100))
         # self.first.player.setVolume(self.first.volume_slider.current_volume)
         self.first.player.play()
-        self.load_lyrics(self.playlist[self.current_index], self.first)
-        self.first.status_label.setText(os.path.splitext(os.path.basename(self.playlist[self.current_index]))[0])
-    # 水平裁切图像，并保存在列表中
-    def crop_image_into_four_horizontal(self, image_path):
-        # 加载原始图片
-        original_pixmap = QPixmap(image_path)
-
-        if original_pixmap.isNull():
-            print("图片加载失败，请检查路径")
+        self.on_track_started()
+
+    def on_track_started(self):
+        """新曲目开始播放后：载入歌词、更新界面，并预读下一首"""
+        path = self.playlist[self.current_index]
+        self.shuffle.played(path)
+        self.load_lyrics(path, self.first)
+        self.set_current_row(self.current_index)
+        self.first.status_label.setText(self.model.display_name(path))
+        self.prefetch_next()
+
+    def on_track_advanced(self, path):
+        """播放引擎已自动切到预载的下一首"""
+        if self.next_index is not None and self.next_index < len(self.playlist) \
+                and self.playlist[self.next_index] == path:
+            self.current_index = self.next_index
+        elif path in self.store:
+            self.current_index = self.playlist.index(path)
+        else:
             return
-
-        # 获取原始图片的尺寸
-        width = original_pixmap.width()
-        height = original_pixmap.height()
-
-        # 计算每个分割部分的宽度
-        part_width = width // 4
-
-        # 创建一个列表用于存储裁剪后的图像
-        cropped_images = []
-
-        for i in range(4):
-            # 定义每个部分的矩形区域
-            rect = QRect(i * part_width, 0, part_width, height)
-
-            # 裁剪图片
-            cropped = original_pixmap.copy(rect)
-
-            # 将裁剪后的图像添加到列表中
-            cropped_images.append(cropped)
-        return cropped_images, part_width, height
+        self.on_track_started()
+
+    def pick_next_index(self):
+        """决定下一首的位置：顺序模式取后一首，随机模式取随机顺序中的下一首"""
+        if self.first.shuffle_mode and len(self.playlist) > 1:
+            row = self.model.row_of(self.shuffle.peek_next())
+            if row >= 0:
+                return row
+        return (self.current_index + 1) % len(self.playlist)
+
+    def prefetch_next(self):
+        """选好下一首并交给后台线程预读音频和歌词"""
+        if not self.playlist:
+            self.next_index = None
+            return
+        self.next_index = self.pick_next_index()
+        self.next_path = self.playlist[self.next_index]
+        self.prefetcher.prefetch(self.next_path)
+        # 播放引擎把下一首载入备用播放器，结束时无缝切换
+        self.first.player.preload(self.next_path)
 
     def load_lyrics(self, audio_path, first):
         """每次加载歌词时更新悬浮窗位置"""
-        self.first.lrc.move(self.geometry().x() + (self.geometry().width() / 2) - self.first.lrc.geometry().width() / 2,
-                      self.geometry().y() + self.geometry().height())
+        if self.first.lrc is not None:  # 悬浮歌词框第一次打开时才创建
+            self.first.lrc.move(self.geometry().x() + (self.geometry().width() / 2) - self.first.lrc.geometry().width() / 2,
+                          self.geometry().y() + self.geometry().height())
 
         """加载与音频同名的 .lrc 歌词文件"""
         base, _ = os.path.splitext(audio_path)
         lrc_path = base + ".lrc"
-        self.lyrics = []
-        # self.current_lyric_index = 1
+        self.lyrics = Lyrics()
+        self.lyric_times = self.lyrics.times
+        self.current_lyric_index = -1
+        if self.first.lyric_panel is not None:
+            self.first.lyric_panel.show_lyrics(self.lyrics)
 
         if not os.path.exists(lrc_path):
             self.first.current_lyric_label.setText("111")
             return
 
-        # 尝试多种编码读取歌词文件
-        encodings = ["utf-8", "gbk", "gb2312", "latin-1"]
-        for encoding in encodings:
-            try:
-                with open(lrc_path, "r", encoding=encoding) as f:
-                    lines = f.readlines()
-                break
-            except UnicodeDecodeError:
-                continue
-        else:
+        # 从缓存中取已解析的歌词（只在文件变化时才重新读取和解析）
+        lyrics = self.lyric_cache.load(lrc_path)
+        if lyrics is None:
             return
-
-        # 解析歌词
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # 处理标准歌词格式 [mm:ss.xx]歌词内容
-            if line.startswith('[') and ']' in line:
-                parts = line.split(']')
-                text = ''.join(parts[1:]).strip()
-
-                # 处理多个时间标签的情况
-                for time_part in parts[:-1]:
-                    time_part = time_part.strip('[')
-                    try:
-                        # 解析时间
-                        if ':' in time_part and '.' in time_part:
-                            # 格式: mm:ss.xx
-                            minutes, seconds = time_part.split(':')
-                            seconds, millis = seconds.split('.')
-                            total_ms = int(minutes) * 60 * 1000 + int(seconds) * 1000 + int(millis) * 10
-                        elif ':' in time_part:
-                            # 格式: mm:ss
-                            minutes, seconds = time_part.split(':')
-                            total_ms = int(minutes) * 60 * 1000 + int(seconds) * 1000
-                        else:
-                            continue
-
-                        self.lyrics.append((total_ms, text))
-                    except (ValueError, IndexError):
-                        continue
-        # 按时间排序
-        self.lyrics.sort(key=lambda x: x[0])
+        self.lyrics = lyrics
+        self.lyric_times = lyrics.times
         self.current_lyric_index = -1  # 重置当前歌词索引
+        if self.first.lyric_panel is not None:
+            self.first.lyric_panel.show_lyrics(lyrics)
+        self.prerender_lyrics(0)
+        self.schedule_lyrics()
+
+    def prerender_lyrics(self, start):
+        """提前渲染从 start 开始的几句歌词（主窗口和悬浮歌词框各自的字体、颜色）"""
+        texts = self.lyrics.texts[start:start + PRERENDER_LINES]
+        self.first.current_lyric_label.prerender(texts)
+        if self.first.lrc is not None:
+            self.first.lrc.lyric_label.prerender(texts)
+
+    def find_lyric_index(self, position):
+        """定位当前歌词行：正常播放时沿游标前进，跳转后二分查找"""
+        times = self.lyric_times
+        count = len(times)
+        # 先看游标所在行和下一行，正常播放时几乎总能命中
+        for index in (self.current_lyric_index, self.current_lyric_index + 1):
+            if -1 <= index < count \
+                    and (index < 0 or times[index] <= position) \
+                    and (index + 1 >= count or position < times[index + 1]):
+                return index
+        return bisect_right(times, position) - 1
+
+    def schedule_lyrics(self):
+        """刷新当前歌词，并把定时器设到下一句歌词出现的时刻；暂停时不再唤醒"""
+        # 拖动进度条期间暂停歌词更新，松开后由 slider_released 重新调度
+        if self.first.progress_slider.isSliderDown():
+            return
+        self.update_lyrics()
+
+        self.lyric_timer.stop()
+        player = self.first.player
+        next_index = self.current_lyric_index + 1
+        if player.state() != QMediaPlayer.PlayingState or next_index >= len(self.lyric_times):
+            return
+        rate = player.playbackRate() or 1.0
+        delay = (self.lyric_times[next_index] - self.lyric_lead - player.position()) / rate
+        # position() 可能还没走到下一句（播放器上报位置有延迟），至少等几毫秒，避免定时器空转
+        self.lyric_timer.start(max(int(delay), 5))
 
     def update_lyrics(self):
         """根据当前播放时间更新歌词显示"""
         # if not self.lyrics or self.player.state() != QMediaPlayer.PlayingState:
         #     return
 
-        current_time = self.first.player.position()
+        current_time = self.first.player.position() + self.lyric_lead
 
         # 找到当前歌词行
-        new_index = -1
-        for i, (timestamp, _) in enumerate(self.lyrics):
-            if timestamp <= current_time:
-                if i < len(self.lyrics) - 1 and self.lyrics[i + 1][0] > current_time:
-                    new_index = i
-                    break
-            else:
-                break
-
-        # 如果是最后一行歌词
-        if new_index == -1 and self.lyrics and self.lyrics[-1][0] <= current_time:
-            new_index = len(self.lyrics) - 1
+        new_index = self.find_lyric_index(current_time)
 
         # 如果歌词行发生变化，更新显示
         if new_index != self.current_lyric_index:
             self.current_lyric_index = new_index
+            # 歌词窗口滚动到这一行
+            if self.first.lyric_panel is not None:
+                self.first.lyric_panel.set_current(new_index)
 
             # 更新顶部大字体歌词
             if 0 <= new_index < len(self.lyrics):
-                self.first.current_lyric_label.setText(self.lyrics[new_index][1])
+                self.first.current_lyric_label.setText(self.lyrics.texts[new_index])
                 '''更新浮动歌词条'''
-                self.first.lrc.lyric_label.clear()  # 清空文本
-                self.first.lrc.lyric_label.setText(self.lyrics[new_index][1])
-                self.first.lrc.lyric_label.fade_in()
+                if self.first.lrc is not None:
+                    self.first.lrc.lyric_label.clear()  # 清空文本
+                    self.first.lrc.lyric_label.setText(self.lyrics.texts[new_index])
+                    self.first.lrc.lyric_label.fade_in()
 
                 self.first.current_lyric_label.adjustSize()
 
                 self.first.current_lyric_label.fade_in()
+                # 空闲时把后面几句先画好，换行时只需贴图
+                QTimer.singleShot(0, lambda: self.prerender_lyrics(new_index + 1))
             else:
                 self.first.current_lyric_label.setText("")
                 self.first.current_lyric_label.adjustSize()
@@ -367,31 +576,14 @@ class PlayList(QWidget):
                 # self.first.lrc.lyric_label.fade_in()
 
     def play_next(self):
-        """播放下一首歌曲"""
-        # if not self.first.all_playlist:
-        #     return
-
-        if self.first.shuffle_mode:
-            # 随机播放下一首
-            if len(self.playlist) > 1:
-                new_index = self.current_index
-                while new_index == self.current_index:
-                    new_index = random.randint(0, len(self.playlist) - 1)
-                self.current_index = new_index
-
-                self.first.player.setMedia(QMediaContent(QUrl.fromLocalFile(self.playlist[self.current_index])))
-                self.first.player.play()
-                self.load_lyrics(self.playlist[self.current_index], self.first)
-                self.song_list.setCurrentRow(self.current_index)
-                self.first.status_label.setText(os.path.splitext(os.path.basename(self.playlist[self.current_index]))[0])
-        else:
-            # 顺序播放下一首
-            self.current_index +=1
-            self.first.player.setMedia(QMediaContent(QUrl.fromLocalFile(self.playlist[self.current_index])))
-            self.first.player.play()
-            self.load_lyrics(self.playlist[self.current_index], self.first)
-            self.song_list.setCurrentRow(self.current_index)
-            self.first.status_label.setText(os.path.splitext(os.path.basename(self.playlist[self.current_index]))[0])
+        """播放下一首歌曲（优先使用已预读的那一首）"""
+        if not self.playlist:
+            return
+        index = self.next_index
+        # 预选之后列表发生了变化，重新选择
+        if index is None or index >= len(self.playlist) or self.playlist[index] != self.next_path:
+            index = self.pick_next_index()
+        self.play_index(index)
 
     def play_preview(self):
         """播放上一首歌曲"""
@@ -399,29 +591,32 @@ class PlayList(QWidget):
         #     return
 
         if self.first.shuffle_mode:
-            # 随机播放上一首
-            if len(self.playlist) > 1:
-                new_index = self.current_index
-                while new_index == self.current_index:
-                    new_index = random.randint(0, len(self.playlist) - 1)
-                self.current_index = new_index
+            # 随机播放时沿播放历史退回；已经退到最前面就停在当前这首
+            path = self.shuffle.peek_previous()
+            row = self.model.row_of(path) if path is not None else -1
+            if row >= 0:
+                self.play_index(row)
         else:
             # 顺序播放上一首
-            self.current_index -=1
-            self.first.player.setMedia(QMediaContent(QUrl.fromLocalFile(self.playlist[self.current_index])))
-            self.first.player.play()
-            self.load_lyrics(self.playlist[self.current_index], self.first)
-            self.song_list.setCurrentRow(self.current_index)
+            self.play_index(self.current_index - 1)
+
+    def set_current_row(self, row):
+        """选中并滚动到指定行；搜索时该歌曲不在结果中则取消选中"""
+        model = self.song_list.model()
+        if model is self.filter_model:
+            if not 0 <= row < len(self.playlist):
+                return
+            row = model.row_of(self.playlist[row])
+            if row < 0:
+                self.song_list.clearSelection()
+                return
+        self.song_list.setCurrentIndex(model.index(row))
 
     def sync_playlist_to_ui(self):
-        """将 QMediaPlaylist 中的所有歌曲同步到 QListWidget"""
-        self.song_list.clear()  # 清空现有内容
+        """将 QMediaPlaylist 中的所有歌曲同步到播放列表视图"""
+        paths = []
         for i in range(self.first.all_playlist.mediaCount()):
-            # 获取媒体内容（QMediaContent）
+            # 获取媒体内容（QMediaContent），从 URL 取出本地路径
             media = self.first.all_playlist.media(i)
-            # 从 URL 提取文件名（你可以自定义显示格式）
-            url = media.canonicalUrl()
-            song_name = url.fileName()  # 只取文件名，比如 "甜蜜蜜.mp3"
-            # 也可以去掉扩展名
-            # song_name = QFileInfo(song_name).baseName()
-            self.song_list.addItem(song_name)
+            paths.append(media.canonicalUrl().toLocalFile())
+        self.model.reset_paths(paths)
@@ -0,0 +1,168 @@
+import os
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+
+class PlaylistModel(QAbstractListModel):
+    """播放列表数据模型，只保存路径，显示名在 data() 中按需生成"""
+
+    PathRole = Qt.UserRole + 1
+    DurationRole = Qt.UserRole + 2
+    NumberRole = Qt.UserRole + 3  # 在完整播放列表中的序号
+
+    def __init__(self, metadata=None, parent=None):
+        super().__init__(parent)
+        # 与视图行一一对应的歌曲路径
+        self.paths = []
+        # 标签/时长缓存（MetadataCache），没有时只显示文件名
+        self.metadata = metadata
+        # 路径 -> 行号，用到时才重建
+        self._rows = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path = self.paths[index.row()]
+        if role == Qt.DisplayRole:
+            # 只在行可见时才会被调用
+            return self.display_name(path)
+        if role == self.DurationRole:
+            info = self.metadata.get(path) if self.metadata else None
+            return info[3] if info else None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == self.NumberRole:
+            return index.row() + 1
+        if role == Qt.ToolTipRole or role == self.PathRole:
+            return path
+        return None
+
+    def path(self, row):
+        return self.paths[row]
+
+    def row_of(self, path):
+        """歌曲所在的行号，不在列表中时返回 -1"""
+        if self._rows is None:
+            self._rows = {path: row for row, path in enumerate(self.paths)}
+        return self._rows.get(path, -1)
+
+    def display_name(self, path):
+        """有标签时显示 歌手 - 标题，否则显示文件名（不含后缀）"""
+        info = self.metadata.get(path) if self.metadata else None
+        if info and info[0]:
+            return f"{info[1]} - {info[0]}" if info[1] else info[0]
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def refresh(self):
+        """元数据更新后通知视图重绘（视图只会重绘可见行）"""
+        if self.paths:
+            self.dataChanged.emit(self.index(0), self.index(len(self.paths) - 1))
+
+    def append(self, paths):
+        """在末尾追加若干行"""
+        if not paths:
+            return
+        start = len(self.paths)
+        self.beginInsertRows(QModelIndex(), start, start + len(paths) - 1)
+        self.paths.extend(paths)
+        if self._rows is not None:
+            self._rows.update((path, start + i) for i, path in enumerate(paths))
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        """删除指定的行（行号需升序），连续的行合并成一次删除"""
+        for first, last in reversed(self._ranges(rows)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.paths[first:last + 1]
+            self._rows = None
+            self.endRemoveRows()
+
+    def reset_paths(self, paths):
+        """整体替换数据"""
+        self.beginResetModel()
+        self.paths = list(paths)
+        self._rows = None
+        self.endResetModel()
+
+    def refresh_rows(self, rows):
+        """通知视图这些行的显示内容有变化"""
+        for first, last in self._ranges(rows):
+            self.dataChanged.emit(self.index(first), self.index(last))
+
+    @staticmethod
+    def _ranges(rows):
+        # 把升序行号压缩成 (起始, 结束) 区间
+        ranges = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        return ranges
+
+
+class FilteredPlaylistModel(PlaylistModel):
+    """搜索结果：只包含匹配的歌曲，序号和显示内容仍取自完整的播放列表"""
+
+    def __init__(self, source, parent=None):
+        super().__init__(source.metadata, parent)
+        self.source = source
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == self.NumberRole and index.isValid():
+            return self.source.row_of(self.paths[index.row()]) + 1
+        return super().data(index, role)
+
+    def display_name(self, path):
+        return self.source.display_name(path)
+
+    def source_row(self, row):
+        """搜索结果中的行对应完整播放列表中的行"""
+        return self.source.row_of(self.paths[row])
+
+
+class PlaylistDelegate(QStyledItemDelegate):
+    """播放列表行：左侧序号、中间歌名、右侧时长"""
+
+    # 默认颜色取自 skin/Purple/Playlist.xml 的 Color_Number / Color_Duration，apply_skin 时按皮肤更新
+    NUMBER_COLOR = QColor("#7578AB")
+    DURATION_COLOR = QColor("#7578AB")
+    # 与样式表中的文字颜色一致
+    TEXT_COLOR = QColor("white")
+
+    def apply_skin(self, layout):
+        self.NUMBER_COLOR = QColor(layout.color('playlist', 'Color_Number', self.NUMBER_COLOR.name()))
+        self.DURATION_COLOR = QColor(layout.color('playlist', 'Color_Duration', self.DURATION_COLOR.name()))
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        opt.text = ""
+        # 先由样式画出背景和选中效果
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        metrics = opt.fontMetrics
+        side = metrics.horizontalAdvance("00000.")
+        rect = opt.rect.adjusted(4, 0, -4, 0)
+        painter.save()
+        painter.setFont(opt.font)
+        painter.setPen(self.NUMBER_COLOR)
+        painter.drawText(rect, Qt.AlignLeft | Qt.AlignVCenter, f"{index.data(PlaylistModel.NumberRole)}.")
+        duration = index.data(PlaylistModel.DurationRole)
+        if duration:
+            seconds = duration // 1000
+            painter.setPen(self.DURATION_COLOR)
+            painter.drawText(rect, Qt.AlignRight | Qt.AlignVCenter, f"{seconds // 60:02d}:{seconds % 60:02d}")
+        title_rect = rect.adjusted(side, 0, -side, 0)
+        painter.setPen(self.TEXT_COLOR)
+        painter.drawText(title_rect, Qt.AlignCenter,
+                         metrics.elidedText(text, Qt.ElideRight, title_rect.width()))
+        painter.restore()
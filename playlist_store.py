@@ -0,0 +1,118 @@
+import os
+import sqlite3
+
+
+class PlaylistStore:
+    """基于 SQLite 的播放列表存储，内存中维护路径列表和哈希索引"""
+
+    def __init__(self, db_path="./play_list.db", legacy_path="./play_list.txt"):
+        self.db_path = db_path
+        self.legacy_path = legacy_path
+        is_new = not os.path.exists(db_path)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "path TEXT NOT NULL UNIQUE)"
+        )
+        # 通过拖入文件夹导入的媒体库根目录，会被持续监视
+        self.conn.execute("CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY)")
+        # 根目录下扫描过的所有子目录（包括没有歌曲的），下次启动时据此区分新建的目录
+        self.conn.execute("CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY)")
+        self.conn.commit()
+
+        # 按插入顺序读入内存，之后的查询都走内存
+        self.paths = [row[0] for row in self.conn.execute("SELECT path FROM tracks ORDER BY id")]
+        self._index = set(self.paths)
+        self.roots = [row[0] for row in self.conn.execute("SELECT path FROM roots")]
+        self.folders = {row[0] for row in self.conn.execute("SELECT path FROM folders")}
+
+        # 第一次创建数据库时，从旧的 play_list.txt 迁移
+        if is_new:
+            self.migrate_legacy()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __getitem__(self, index):
+        return self.paths[index]
+
+    def __contains__(self, path):
+        return path in self._index
+
+    def migrate_legacy(self):
+        """把旧版 play_list.txt 中的歌曲导入数据库"""
+        if not os.path.exists(self.legacy_path):
+            return []
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except Exception as e:
+            print(f"迁移失败：{e}")
+            return []
+        added = self.add_many(lines)
+        print(f"已从 {self.legacy_path} 迁移 {len(added)} 首歌曲")
+        return added
+
+    def add(self, path):
+        """添加一首歌曲，已存在则返回 False"""
+        return bool(self.add_many([path]))
+
+    def add_many(self, paths):
+        """批量添加歌曲，一次事务写入，返回真正新增的路径列表"""
+        added = []
+        for path in paths:
+            path = path.strip()
+            if not path or path in self._index:
+                continue
+            self._index.add(path)
+            added.append(path)
+        if added:
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO tracks (path) VALUES (?)",
+                                      [(path,) for path in added])
+            self.paths.extend(added)
+        return added
+
+    def remove_many(self, paths):
+        """批量删除歌曲，返回真正删除的路径列表"""
+        removed = [path for path in dict.fromkeys(paths) if path in self._index]
+        if removed:
+            with self.conn:
+                self.conn.executemany("DELETE FROM tracks WHERE path = ?", [(path,) for path in removed])
+            gone = set(removed)
+            self._index -= gone
+            self.paths[:] = [path for path in self.paths if path not in gone]
+        return removed
+
+    def add_roots(self, folders):
+        """记录媒体库根目录，返回新增的目录"""
+        added = [folder for folder in dict.fromkeys(folders) if folder not in self.roots]
+        if added:
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO roots (path) VALUES (?)", [(folder,) for folder in added])
+            self.roots.extend(added)
+        return added
+
+    def add_folders(self, folders):
+        added = [folder for folder in dict.fromkeys(folders) if folder not in self.folders]
+        if added:
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO folders (path) VALUES (?)", [(folder,) for folder in added])
+            self.folders.update(added)
+        return added
+
+    def remove_folders(self, folders):
+        removed = [folder for folder in dict.fromkeys(folders) if folder in self.folders]
+        if removed:
+            with self.conn:
+                self.conn.executemany("DELETE FROM folders WHERE path = ?", [(folder,) for folder in removed])
+            self.folders.difference_update(removed)
+        return removed
+
+    def close(self):
+        self.conn.close()
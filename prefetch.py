@@ -0,0 +1,87 @@
+import os
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from lyrics import read_lyrics
+
+# 预读音频文件的上限，足够覆盖常见歌曲，又不会把超大文件整个读进来
+WARM_LIMIT = 32 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+def warm_file(path, limit=WARM_LIMIT):
+    """顺序读一遍文件，让它进入系统缓存；网络共享上的文件切歌时就不必再等待"""
+    read = 0
+    try:
+        with open(path, 'rb') as f:
+            while read < limit:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                read += len(chunk)
+    except OSError as e:
+        print(f"预读失败：{e}")
+    return read
+
+
+class PrefetchSignals(QObject):
+    # 音频路径, 歌词解析结果 (缓存键, 编码, 歌词) 或 None
+    finished = pyqtSignal(str, object)
+
+
+class PrefetchTask(QRunnable):
+    """后台预读任务：预热音频文件并解析歌词"""
+
+    def __init__(self, audio_path, lrc_path=None, encoding=None):
+        super().__init__()
+        self.audio_path = audio_path
+        self.lrc_path = lrc_path
+        self.encoding = encoding
+        self.signals = PrefetchSignals()
+
+    def run(self):
+        warm_file(self.audio_path)
+        result = read_lyrics(self.lrc_path, self.encoding) if self.lrc_path else None
+        self.signals.finished.emit(self.audio_path, result)
+
+
+class Prefetcher(QObject):
+    """预读下一首歌曲；结果在主线程中放进歌词缓存，切歌时直接命中"""
+
+    ready = pyqtSignal(str)
+
+    def __init__(self, lyric_cache, parent=None):
+        super().__init__(parent)
+        self.lyric_cache = lyric_cache
+        self.pool = QThreadPool.globalInstance()
+        self.pending = None  # 正在预读的音频路径
+        self.ready_path = None  # 已预读完成的音频路径
+        self._tasks = {}
+
+    def prefetch(self, audio_path):
+        if not audio_path or audio_path in (self.pending, self.ready_path):
+            return
+        self.pending = audio_path
+        self.ready_path = None
+
+        # 歌词已在缓存中时只预热音频文件
+        lrc_path = os.path.splitext(audio_path)[0] + ".lrc"
+        if not os.path.exists(lrc_path) or self.lyric_cache.contains(lrc_path):
+            lrc_path = None
+
+        task = PrefetchTask(audio_path, lrc_path, self.lyric_cache.encodings.get(lrc_path))
+        task.signals.finished.connect(self._on_finished)
+        # 保留引用，避免任务结束前信号对象被回收
+        self._tasks[audio_path] = task
+        self.pool.start(task)
+
+    def is_ready(self, audio_path):
+        return audio_path is not None and audio_path == self.ready_path
+
+    def _on_finished(self, audio_path, result):
+        self._tasks.pop(audio_path, None)
+        if result is not None:
+            self.lyric_cache.put(*result)
+        if audio_path == self.pending:
+            self.pending = None
+            self.ready_path = audio_path
+            self.ready.emit(audio_path)
@@ -0,0 +1,225 @@
+import time
+import random
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+# 中文标题的拼音首字母需要 pypinyin（可选依赖：pip install pypinyin）
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:
+    lazy_pinyin = None
+
+
+def _has_cjk(text):
+    return any('一' <= ch <= '鿿' for ch in text)
+
+
+def pinyin_initials(text):
+    """中文转拼音首字母，例如 周杰伦 -> zjl；非中文部分原样保留"""
+    if lazy_pinyin is None or not _has_cjk(text):
+        return ''
+    return ''.join(lazy_pinyin(text, style=Style.FIRST_LETTER))
+
+
+def _grams(text):
+    """单字和相邻两字组成的 n-gram"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class SearchIndex:
+    """播放列表搜索索引：对文件名、标题、歌手及拼音首字母建立 1/2-gram 倒排表。
+
+    查询时取最短的倒排表作为候选，只对候选做子串校验，不必扫描整个列表。
+    倒排表始终按编号递增且不重复；歌曲内容更新时按新旧 gram 的差异增删条目。
+    """
+
+    def __init__(self):
+        self.paths = []  # 编号 -> 路径
+        self.ids = {}  # 路径 -> 编号
+        self.keys = []  # 编号 -> 可搜索文本（小写，各字段以换行分隔）
+        self.removed = set()
+        self.doc_grams = []  # 编号 -> 已写入倒排表的 gram 集合
+        self.grams = {}  # gram -> 编号数组（按编号递增）
+        self.pending = deque()  # 已加入或更新、还没写入倒排表的编号
+        self.queued = set()  # pending 中的编号，这些歌曲在倒排表中的条目可能还是旧的
+        self.version = 0
+        self._last = None  # (版本, 查询词, 结果编号)，用于输入时逐步缩小结果
+
+    def __len__(self):
+        return len(self.paths) - len(self.removed)
+
+    def add(self, path, *texts):
+        """加入或更新一首歌曲；texts 为文件名、标题、歌手等字段"""
+        fields = [text.lower() for text in texts if text]
+        fields.extend(initials for initials in map(pinyin_initials, texts[:3] if texts else ()) if initials)
+        key = '\n'.join(dict.fromkeys(fields))
+
+        doc = self.ids.get(path)
+        if doc is None:
+            doc = len(self.paths)
+            self.ids[path] = doc
+            self.paths.append(path)
+            self.keys.append(key)
+            self.doc_grams.append(frozenset())
+        else:
+            if doc in self.removed:
+                # 删除后又加回来：之前的查询结果里没有它，缓存作废
+                self.removed.discard(doc)
+                self.version += 1
+            if self.keys[doc] == key:
+                return
+            # 倒排表在 build 时按差异更新，在此之前查询会对这首歌做子串校验
+            self.keys[doc] = key
+        if doc not in self.queued:
+            self.queued.add(doc)
+            self.pending.append(doc)
+        self.version += 1
+
+    def remove(self, path):
+        doc = self.ids.get(path)
+        if doc is not None and doc not in self.removed:
+            self.removed.add(doc)
+            self.version += 1
+
+    def build(self, limit=None):
+        """为待处理的歌曲建立倒排表，每次最多 limit 首；返回剩余数量"""
+        count = len(self.pending) if limit is None else min(limit, len(self.pending))
+        grams = self.grams
+        for _ in range(count):
+            doc = self.pending.popleft()
+            self.queued.discard(doc)
+            doc_grams = set()
+            for segment in self.keys[doc].split('\n'):
+                doc_grams.update(_grams(segment))
+            doc_grams = frozenset(doc_grams)
+            old = self.doc_grams[doc]
+            for gram in doc_grams - old:
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = array('i')
+                if not postings or postings[-1] < doc:
+                    postings.append(doc)
+                else:
+                    # 更新的是较早加入的歌曲，插到有序位置
+                    postings.insert(bisect_left(postings, doc), doc)
+            for gram in old - doc_grams:
+                postings = grams[gram]
+                postings.pop(bisect_left(postings, doc))
+                if not postings:
+                    del grams[gram]
+            self.doc_grams[doc] = doc_grams
+        return len(self.pending)
+
+    def search(self, query):
+        """返回匹配的路径列表（按加入顺序）；查询为空时返回 None（表示不过滤）"""
+        terms = query.lower().split()
+        if not terms:
+            return None
+        query_key = ' '.join(terms)
+        keys = self.keys
+        removed = self.removed
+
+        if len(terms) == 1:
+            term = terms[0]
+
+            def matches(doc):
+                return doc not in removed and term in keys[doc]
+        else:
+            def matches(doc):
+                return doc not in removed and all(term in keys[doc] for term in terms)
+
+        shortest, second = self._shortest(terms)
+        last = self._last
+        if last is not None and last[0] == self.version and query_key.startswith(last[1]) \
+                and (shortest is None or len(last[2]) < len(shortest)):
+            # 在上一次结果的基础上继续输入，只需校验上次的结果
+            result = [doc for doc in last[2] if matches(doc)]
+        elif shortest is None:
+            # 有 gram 不存在：只可能匹配还没建好倒排表的歌曲
+            result = sorted(doc for doc in self.queued if matches(doc))
+        elif len(terms) == 1 and len(terms[0]) <= 2 and terms[0] in self.grams:
+            # 查询词本身就是一个 gram，倒排表就是答案，只需校验还没写入倒排表的歌曲
+            queued = self.queued
+            if removed or queued:
+                result = [doc for doc in shortest if doc not in removed and doc not in queued]
+            else:
+                result = shortest.tolist()
+            extra = [doc for doc in queued if matches(doc)]
+            if extra:
+                result = sorted(set(result).union(extra))
+        else:
+            candidates = list(shortest)
+            if second is not None and len(shortest) > 1000:
+                # 候选较多时先与第二短的倒排表求交集，减少子串校验
+                other = set(second)
+                candidates = [doc for doc in candidates if doc in other]
+            result = [doc for doc in candidates if matches(doc)]
+            if self.queued:
+                # 还没写入倒排表的歌曲单独校验，合并后按编号排序
+                extra = [doc for doc in self.queued if matches(doc)]
+                if extra:
+                    result = sorted(set(result).union(extra))
+
+        self._last = (self.version, query_key, result)
+        paths = self.paths
+        return [paths[doc] for doc in result]
+
+    def _shortest(self, terms):
+        """用来取候选的两个倒排表：多个查询词时取不同查询词各自最短的两个，
+        只有一个查询词时取它最短的两个；有 gram 不存在时返回 (None, None)"""
+        per_term = []
+        for term in terms:
+            lists = []
+            for gram in _grams(term):
+                postings = self.grams.get(gram)
+                if postings is None:
+                    return None, None
+                lists.append(postings)
+            lists.sort(key=len)
+            per_term.append(lists)
+        if len(per_term) > 1:
+            ordered = sorted((lists[0] for lists in per_term), key=len)
+        else:
+            ordered = per_term[0]
+        second = next((postings for postings in ordered[1:] if postings is not ordered[0]), None)
+        return ordered[0], second
+
+def benchmark(count=100000):
+    """模拟启动流程：先按文件名建索引，读到标签后再用标题、歌手更新每一首，然后计时查询"""
+    rng = random.Random(0)
+    words = ["love", "night", "rain", "star", "heart", "dream", "fire", "blue", "song", "time",
+             "晴天", "稻香", "夜曲", "七里香", "告白气球", "青花瓷", "后来", "十年", "平凡之路", "光年之外"]
+    artists = ["周杰伦", "陈奕迅", "林俊杰", "Adele", "Coldplay", "Taylor Swift", "王菲", "邓紫棋"]
+    index = SearchIndex()
+    tracks = []
+    for i in range(count):
+        title = " ".join(rng.sample(words, 2))
+        tracks.append((f"/music/{i:06d} {title}.mp3", title, rng.choice(artists)))
+
+    start = time.perf_counter()
+    for path, title, artist in tracks:
+        index.add(path, f"{path[7:-4]}")
+    index.build()
+    print(f"{count} 首按文件名建索引：{(time.perf_counter() - start) * 1000:.0f} ms")
+    start = time.perf_counter()
+    for path, title, artist in tracks:
+        index.add(path, f"{path[7:-4]}", title, artist)
+    index.build()
+    print(f"用标题、歌手更新每一首：{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    duplicates = sum(len(postings) - len(set(postings)) for postings in index.grams.values())
+    unsorted = sum(any(a >= b for a, b in zip(postings, postings[1:])) for postings in index.grams.values())
+    print(f"倒排表重复条目 {duplicates}，未排序 {unsorted}")
+    for query in ("lo", "ti", "l", "周", "zjl", "love night", "七里香", "000123", "x"):
+        index._last = None
+        start = time.perf_counter()
+        result = index.search(query)
+        print(f"  {query!r}: {len(result)} 首，{(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    # python search_index.py  十万首歌曲的搜索性能测试
+    benchmark()
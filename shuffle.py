@@ -0,0 +1,121 @@
+import random
+
+# 最多记住多少首播放历史（用于“上一首”和退回后再“下一首”）
+HISTORY_SIZE = 500
+
+
+class ShuffleOrder:
+    """随机播放顺序：每一轮把所有歌曲各播一次，不重复。
+
+    相当于边播边做 Fisher-Yates 洗牌：pool 是本轮还没播过的歌曲，每次随机取一首，
+    和末尾交换后弹出，取下一首和增删歌曲都是 O(1)；pool 空了再开始新的一轮。
+    播放过的歌曲按顺序记在 history 中，cursor 指向当前这一首，上一首/下一首沿着历史走。
+    """
+
+    def __init__(self, paths, history_size=HISTORY_SIZE):
+        self.paths = paths  # 播放列表（与 PlaylistStore.paths 是同一个列表）
+        self.history_size = history_size
+        self.pool = None  # 本轮未播放的歌曲，第一次需要时才建立
+        self.positions = {}  # 歌曲 -> 在 pool 中的位置
+        self.history = []
+        self.cursor = -1
+        self.upcoming = None  # 已经选好、还没开始播放的下一首
+
+    def peek_next(self):
+        """下一首（不改变状态，可以反复调用）；之前退回过时沿历史前进"""
+        if self.cursor + 1 < len(self.history):
+            return self.history[self.cursor + 1]
+        if self.upcoming is None:
+            self.upcoming = self._draw()
+        return self.upcoming
+
+    def peek_previous(self):
+        """上一首；已经退到历史最前面时返回 None"""
+        return self.history[self.cursor - 1] if self.cursor > 0 else None
+
+    def played(self, path):
+        """某首歌开始播放时调用：沿历史前进/后退，或作为新的一首记入历史"""
+        if self.cursor + 1 < len(self.history) and self.history[self.cursor + 1] == path:
+            self.cursor += 1
+            return
+        if path == self.upcoming:
+            self.upcoming = None
+        elif self.cursor > 0 and self.history[self.cursor - 1] == path:
+            self.cursor -= 1
+            return
+        elif 0 <= self.cursor < len(self.history) and self.history[self.cursor] == path:
+            return
+        else:
+            # 手动点播的歌曲，本轮不再随机到它
+            if self.pool is None:
+                self._refill()
+            self._discard(path)
+        # 从历史中间点播时，后面的“前进”记录作废
+        del self.history[self.cursor + 1:]
+        self.history.append(path)
+        if len(self.history) > self.history_size:
+            del self.history[:len(self.history) - self.history_size]
+        self.cursor = len(self.history) - 1
+
+    def add(self, paths):
+        """新加入的歌曲在本轮中还会播到"""
+        if self.pool is None:
+            return
+        for path in paths:
+            if path not in self.positions:
+                self.positions[path] = len(self.pool)
+                self.pool.append(path)
+
+    def remove(self, paths):
+        gone = set(paths)
+        for path in gone:
+            self._discard(path)
+        if self.upcoming in gone:
+            self.upcoming = None
+        if any(path in gone for path in self.history):
+            # 历史中可能多次出现同一首歌，按位置换算游标，而不是按歌曲查找
+            history, cursor = [], -1
+            for i, path in enumerate(self.history):
+                if path in gone:
+                    continue
+                # 删掉中间的歌曲后前后相同的两项合并为一项
+                if not history or history[-1] != path:
+                    history.append(path)
+                if i <= self.cursor:
+                    cursor = len(history) - 1
+            self.history = history
+            self.cursor = cursor
+
+    def reset(self):
+        """重新开始一轮（不清除历史）"""
+        self.pool = None
+        self.positions = {}
+        self.upcoming = None
+
+    def _refill(self):
+        self.pool = list(self.paths)
+        self.positions = {path: i for i, path in enumerate(self.pool)}
+
+    def _discard(self, path):
+        position = self.positions.pop(path, None)
+        if position is None:
+            return
+        last = self.pool.pop()
+        if position < len(self.pool):
+            self.pool[position] = last
+            self.positions[last] = position
+
+    def _draw(self):
+        if not self.pool:
+            self._refill()
+            if not self.pool:
+                return None
+        pool = self.pool
+        current = self.history[self.cursor] if 0 <= self.cursor < len(self.history) else None
+        index = random.randrange(len(pool))
+        if pool[index] == current and len(pool) > 1:
+            # 新一轮的第一首不要正好是刚播完的那首
+            index = (index + 1 + random.randrange(len(pool) - 1)) % len(pool)
+        path = pool[index]
+        self._discard(path)
+        return path
@@ -0,0 +1,178 @@
+import os
+import json
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPixmap, QImage, QPainter, QPainterPath, QPalette, QBrush, QIcon
+
+# 预渲染图集：所有圆角处理后的皮肤图拼成一张 PNG，下次启动直接读取
+ATLAS_VERSION = 1
+# 窗口背景的圆角半径
+WINDOW_RADIUS = 8
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def round_pixmap(pixmap, radius):
+    """把图片四角裁成圆角"""
+    rounded = QPixmap(pixmap.size())
+    rounded.fill(Qt.transparent)
+    painter = QPainter(rounded)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.SmoothPixmapTransform)
+
+    path = QPainterPath()
+    rect = pixmap.rect()
+    path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), radius, radius)
+    painter.setClipPath(path)
+
+    painter.drawPixmap(0, 0, pixmap)
+    painter.end()
+    return rounded
+
+
+class SkinCache:
+    """皮肤图片缓存：每张 BMP 只解码一次，四态按钮图只切一次，
+    圆角结果按 (路径, 状态, 半径) 记住，并可保存成磁盘图集。
+    """
+
+    def __init__(self, atlas_path="./skin_atlas.png"):
+        self.atlas_path = atlas_path
+        self.index_path = os.path.splitext(atlas_path)[0] + ".json"
+        self.images = {}  # 路径 -> 原图
+        self.strips = {}  # 路径 -> 四个状态的切片
+        self.rounded = {}  # (路径, 状态, 半径) -> 圆角图
+        self.sources = {}  # 用到的原图路径 -> [修改时间, 大小]
+        self._atlas = None  # 还没取出的图集条目：键 -> QRect
+        self._atlas_pixmap = None
+        self._dirty = False
+
+    def image(self, path):
+        """解码后的原图，同一路径只读取一次"""
+        pixmap = self.images.get(path)
+        if pixmap is None:
+            pixmap = QPixmap(path)
+            if pixmap.isNull():
+                print(f"图片加载失败，请检查路径：{path}")
+            self.images[path] = pixmap
+        return pixmap
+
+    def states(self, path):
+        """水平排列的四态按钮图（普通、悬停、按下、禁用）切成四张"""
+        strip = self.strips.get(path)
+        if strip is None:
+            original = self.image(path)
+            part_width = original.width() // 4
+            strip = [original.copy(QRect(i * part_width, 0, part_width, original.height())) for i in range(4)]
+            self.strips[path] = strip
+        return strip
+
+    def pixmap(self, path, state=None, radius=0):
+        """取圆角处理后的图片；state 为 None 表示整张图，否则为四态中的第几张"""
+        key = (path, state, radius)
+        pixmap = self.rounded.get(key)
+        if pixmap is not None:
+            return pixmap
+        pixmap = self._from_atlas(key)
+        if pixmap is None:
+            source = self.image(path) if state is None else self.states(path)[state]
+            pixmap = round_pixmap(source, radius) if radius else source
+            self._dirty = True
+        self.rounded[key] = pixmap
+        self.sources.setdefault(path, _stamp(path))
+        return pixmap
+
+    def apply_background(self, widget, layout, window, applied=None):
+        """把皮肤中 window 的背景图（圆角处理后）设为窗口背景，窗口大小与图片一致。
+
+        applied 为 {控件: 图片路径}，图片没变时不重复设置。
+        """
+        background = layout.image(window)
+        if not background or (applied is not None and applied.get(widget) == background):
+            return
+        pixmap = self.pixmap(background, radius=WINDOW_RADIUS)
+        widget.setFixedSize(pixmap.width(), pixmap.height())
+        palette = QPalette()
+        palette.setBrush(QPalette.Window, QBrush(pixmap))  # 原图大小
+        widget.setPalette(palette)
+        if applied is not None:
+            applied[widget] = background
+
+    def apply_icon(self, button, layout, window, element, applied=None):
+        """关闭、置顶等图标按钮：图标取四态图的第一张，位置取自皮肤，图标大小与按钮一致"""
+        image = layout.image(window, element)
+        if not image:
+            return
+        icon = self.pixmap(image, 0, 3)
+        if applied is None or applied.get(button) != image:
+            button.setIcon(QIcon(icon))
+            if applied is not None:
+                applied[button] = image
+        rect = layout.place(window, element, (icon.width(), icon.height()))
+        if rect:
+            button.setGeometry(*rect)
+        button.setIconSize(button.size())
+
+    def _from_atlas(self, key):
+        if self._atlas is None:
+            self._load_atlas()
+        rect = self._atlas.pop(self._key_text(key), None)
+        if rect is None:
+            return None
+        return self._atlas_pixmap.copy(rect)
+
+    @staticmethod
+    def _key_text(key):
+        path, state, radius = key
+        return f"{path}|{'' if state is None else state}|{radius}"
+
+    def _load_atlas(self):
+        """读入磁盘图集，原图修改过的条目作废"""
+        self._atlas = {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("version") != ATLAS_VERSION:
+            return
+        pixmap = QPixmap(self.atlas_path)
+        if pixmap.isNull():
+            return
+        valid = {path for path, stamp in index.get("sources", {}).items() if stamp == _stamp(path)}
+        for key, (x, y, width, height) in index.get("entries", {}).items():
+            if key.split("|", 1)[0] in valid:
+                self._atlas[key] = QRect(x, y, width, height)
+        self._atlas_pixmap = pixmap
+
+    def save(self):
+        """有新渲染的图片时，把所有已用到的圆角图竖着拼成一张图集保存"""
+        if not self._dirty or not self.rounded:
+            return
+        items = list(self.rounded.items())
+        width = max(pixmap.width() for _, pixmap in items)
+        height = sum(pixmap.height() for _, pixmap in items)
+        atlas = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+        atlas.fill(Qt.transparent)
+        painter = QPainter(atlas)
+        entries = {}
+        y = 0
+        for key, pixmap in items:
+            painter.drawPixmap(0, y, pixmap)
+            entries[self._key_text(key)] = [0, y, pixmap.width(), pixmap.height()]
+            y += pixmap.height()
+        painter.end()
+        if not atlas.save(self.atlas_path, "PNG"):
+            print(f"皮肤图集保存失败：{self.atlas_path}")
+            return
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump({"version": ATLAS_VERSION, "sources": self.sources, "entries": entries}, f)
+        except OSError as e:
+            print(f"皮肤图集索引保存失败：{e}")
+            return
+        self._dirty = False
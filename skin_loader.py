@@ -0,0 +1,175 @@
+import os
+import re
+
+# 千千静听皮肤目录中的描述文件
+SKIN_FILES = ("Skin.xml", "Playlist.xml", "Lyric.xml", "Visual.xml")
+DEFAULT_SKIN = "./skin/Purple"
+# 皮肤里的 Tahoma 没有中文字形，界面文字统一用这个字体
+TEXT_FONT = "PingFang SC"
+
+# Skin.xml 不是严格的 XML（有未加引号的属性值，编码也不统一），用正则宽松解析
+TAG_RE = re.compile(r"<\s*(/?)\s*([\w:-]+)([^<>]*?)(/?)\s*>")
+ATTR_RE = re.compile(r"""([\w:-]+)\s*=\s*("[^"]*"|'[^']*'|[^\s"'/>]+)""")
+
+_layouts = {}  # 皮肤目录 -> (各文件的修改时间, SkinLayout)
+
+
+def _decode(data):
+    for encoding in ("utf-8", "gbk"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1")
+
+
+def parse_tags(text):
+    """把标签解析成嵌套的 (名称, 属性, 子节点列表)，返回顶层节点列表"""
+    root = []
+    stack = [("", {}, root)]
+    for match in TAG_RE.finditer(text):
+        closing, name, body, self_closing = match.groups()
+        if name.startswith("?") or name.startswith("!"):
+            continue
+        if closing:
+            # 找到对应的开始标签；不匹配的结束标签直接忽略
+            for depth in range(len(stack) - 1, 0, -1):
+                if stack[depth][0] == name:
+                    del stack[depth:]
+                    break
+            continue
+        attrs = {key: value.strip("\"'") for key, value in ATTR_RE.findall(body)}
+        node = (name, attrs, [])
+        stack[-1][2].append(node)
+        if not self_closing and not body.rstrip().endswith("/"):
+            stack.append(node)
+    return root
+
+
+def parse_rect(text):
+    """"左, 上, 右, 下" -> (x, y, 宽, 高)"""
+    try:
+        left, top, right, bottom = (int(part) for part in text.split(","))
+    except (AttributeError, ValueError):
+        return None
+    return left, top, right - left, bottom - top
+
+
+def parse_logfont(text):
+    """Windows LOGFONT 字符串（高度,...,粗细,...,字体名） -> (字体名, 像素大小, 粗细)"""
+    parts = text.split(",") if text else []
+    if len(parts) < 14:
+        return None
+    try:
+        return parts[13].strip(), abs(int(parts[0])), int(parts[4])
+    except ValueError:
+        return None
+
+
+class SkinLayout:
+    """解析好的皮肤：各窗口的背景图、元素位置和图片，以及列表/歌词/频谱的配色"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.name = os.path.basename(os.path.normpath(directory))
+        # 窗口名 -> 窗口属性（image 已转成完整路径，rect 已解析）
+        self.windows = {}
+        # 窗口名 -> {元素名: 元素属性}
+        self.elements = {}
+        # Playlist.xml / Lyric.xml / Visual.xml 中的配置
+        self.playlist = {}
+        self.lyric = {}
+        self.visual = {}
+        self._files = None
+
+    def load(self):
+        skin = self._read("Skin.xml")
+        for node in parse_tags(skin):
+            if node[0] != "skin":
+                continue
+            for name, attrs, children in node[2]:
+                self.windows[name] = self._resolve(attrs)
+                self.elements[name] = {child[0]: self._resolve(child[1]) for child in children}
+        for file_name, target in (("Playlist.xml", self.playlist), ("Lyric.xml", self.lyric),
+                                  ("Visual.xml", self.visual)):
+            for name, attrs, children in parse_tags(self._read(file_name)):
+                # 这些文件都只有一个配置节点
+                for child in children:
+                    target.update(child[1])
+        return self
+
+    def _read(self, file_name):
+        try:
+            with open(os.path.join(self.directory, file_name), "rb") as f:
+                return _decode(f.read())
+        except OSError as e:
+            print(f"皮肤文件读取失败：{e}")
+            return ""
+
+    def _resolve(self, attrs):
+        attrs = dict(attrs)
+        if "position" in attrs:
+            attrs["rect"] = parse_rect(attrs["position"])
+        for key, value in attrs.items():
+            if key.endswith("image") and value:
+                attrs[key] = self.path(value)
+        return attrs
+
+    def path(self, file_name):
+        """皮肤内文件的完整路径；Windows 皮肤的文件名大小写不一定一致，按不区分大小写查找"""
+        if self._files is None:
+            try:
+                self._files = {name.lower(): name for name in os.listdir(self.directory)}
+            except OSError:
+                self._files = {}
+        return os.path.join(self.directory, self._files.get(file_name.lower(), file_name)).replace("\\", "/")
+
+    def window(self, name):
+        return self.windows.get(name, {})
+
+    def element(self, window, name):
+        return self.elements.get(window, {}).get(name)
+
+    def image(self, window, name=None, key="image"):
+        attrs = self.window(window) if name is None else self.element(window, name)
+        return attrs.get(key) if attrs else None
+
+    def place(self, window, name, size=None):
+        """元素的 (x, y, 宽, 高)；给出图片大小时以图片为准，align=right 时靠右对齐"""
+        attrs = self.element(window, name)
+        if not attrs or not attrs.get("rect"):
+            return None
+        x, y, width, height = attrs["rect"]
+        if size is not None:
+            if attrs.get("align") == "right":
+                x += width - size[0]
+            width, height = size
+        return x, y, width, height
+
+    def color(self, section, key, default=None):
+        return getattr(self, section).get(key, default)
+
+    def font(self, section):
+        return parse_logfont(getattr(self, section).get("Font"))
+
+
+def _stamps(directory):
+    stamps = []
+    for file_name in SKIN_FILES:
+        try:
+            stamps.append(os.stat(os.path.join(directory, file_name)).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def load_skin(directory=DEFAULT_SKIN):
+    """读取皮肤目录；同一皮肤只解析一次，描述文件修改后才重新解析"""
+    key = os.path.normpath(directory)
+    stamps = _stamps(directory)
+    cached = _layouts.get(key)
+    if cached is not None and cached[0] == stamps:
+        return cached[1]
+    layout = SkinLayout(directory).load()
+    _layouts[key] = (stamps, layout)
+    return layout
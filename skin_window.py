@@ -0,0 +1,23 @@
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt
+
+
+class SkinWindow(QWidget):
+    """皮肤绘制的无边框窗口（歌词窗口、均衡器等），按住窗口任意位置可以拖动"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.FramelessWindowHint)
+        self.setAutoFillBackground(True)
+        self.drag_position = None
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.drag_position = event.globalPos() - self.frameGeometry().topLeft()
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() == Qt.LeftButton and self.drag_position is not None:
+            self.move(event.globalPos() - self.drag_position)
+
+    def mouseReleaseEvent(self, event):
+        self.drag_position = None
@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+import builtins
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# 启动耗时记录：设置环境变量 TTPLAYER_TRACE=文件名，或加参数 --trace-startup[=文件名] 时启用。
+# 结果是 Chrome trace 格式的 JSON，可以在 chrome://tracing 或 https://ui.perfetto.dev 中打开。
+ENV_VAR = "TTPLAYER_TRACE"
+FLAG = "--trace-startup"
+DEFAULT_PATH = "./startup_trace.json"
+# 短于这个时间（微秒）的导入不记录
+IMPORT_THRESHOLD = 100
+
+_path = None
+_origin = time.perf_counter()
+_events = []
+_counters = Counter()
+_original_import = None
+_written = False
+
+
+def enabled():
+    return _path is not None
+
+
+def _now():
+    return (time.perf_counter() - _origin) * 1e6
+
+
+def _record(name, category, start, duration, args=None):
+    event = {"name": name, "cat": category, "ph": "X", "ts": round(start, 1), "dur": round(duration, 1),
+             "pid": os.getpid(), "tid": threading.get_ident()}
+    if args:
+        event["args"] = args
+    _events.append(event)
+
+
+def _traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # 已导入的模块直接返回，只给真正加载模块的那次导入计时
+    if level == 0 and name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    start = _now()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        duration = _now() - start
+        if duration >= IMPORT_THRESHOLD:
+            _record(f"import {name}", "import", start, duration)
+
+
+def start(argv=None):
+    """按环境变量或命令行参数决定是否启用；需在导入 PyQt5 等模块之前调用"""
+    global _path, _original_import
+    argv = sys.argv if argv is None else argv
+    path = os.environ.get(ENV_VAR)
+    for arg in list(argv[1:]):
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            path = arg.partition("=")[2] or path or DEFAULT_PATH
+            argv.remove(arg)
+    if not path or _path is not None:
+        return False
+    _path = path
+    _original_import = builtins.__import__
+    builtins.__import__ = _traced_import
+    mark("trace start")
+    return True
+
+
+@contextmanager
+def _phase(name, args):
+    start = _now()
+    try:
+        yield
+    finally:
+        _record(name, "phase", start, _now() - start, args)
+
+
+def phase(name, **args):
+    """记录一段启动阶段：with startup_trace.phase("加载界面"): ..."""
+    if _path is None:
+        return nullcontext()
+    return _phase(name, args)
+
+
+def mark(name, **args):
+    """记录一个时间点（例如首次绘制、可以交互）"""
+    if _path is None:
+        return
+    event = {"name": name, "cat": "mark", "ph": "i", "s": "g", "ts": round(_now(), 1),
+             "pid": os.getpid(), "tid": threading.get_ident()}
+    if args:
+        event["args"] = args
+    _events.append(event)
+
+
+def count(name, n=1):
+    """启用时累计一个计数（例如重绘次数），退出时由 report_counters 打印"""
+    if _path is None:
+        return
+    _counters[name] += n
+
+
+def report_counters():
+    if _path is None or not _counters:
+        return
+    print("运行计数：" + "，".join(f"{name} {value} 次" for name, value in _counters.items()))
+
+
+def finish():
+    """启动完成（可以交互）时调用：停止记录导入耗时，写出 trace 文件并打印各阶段耗时"""
+    global _written
+    if _path is None or _written:
+        return
+    _written = True
+    mark("interactive")
+    builtins.__import__ = _original_import
+    try:
+        with open(_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"启动耗时记录保存失败：{e}")
+        return
+    print(f"启动耗时记录已写入 {_path}")
+    for event in _events:
+        if event["cat"] == "phase":
+            print(f"  {event['ts'] / 1000:8.1f} ms  {event['dur'] / 1000:7.1f} ms  {event['name']}")
+        elif event["cat"] == "mark":
+            print(f"  {event['ts'] / 1000:8.1f} ms  {'':>10}  [{event['name']}]")
+    imports = sorted((e for e in _events if e["cat"] == "import"), key=lambda e: e["dur"], reverse=True)
+    for event in imports[:10]:
+        print(f"  {'':>8}     {event['dur'] / 1000:7.1f} ms  {event['name']}")
@@ -0,0 +1,113 @@
+import os
+import sys
+import glob
+import time
+import hashlib
+import importlib.util
+from PyQt5.QtCore import PYQT_VERSION_STR
+
+# 由 .ui 文件生成的 Python 界面类存放在这里，文件名带 .ui 内容的哈希
+CACHE_DIR = "./ui_cache"
+UI_DIR = "./Designer_ui"
+
+_classes = {}  # 模块文件 -> 界面类
+
+
+def ui_hash(ui_path):
+    """.ui 内容和 PyQt5 版本的哈希，任一变化都会重新生成"""
+    with open(ui_path, "rb") as f:
+        data = f.read()
+    return hashlib.sha1(data + PYQT_VERSION_STR.encode()).hexdigest()[:16]
+
+
+def compiled_path(ui_path, digest):
+    stem = os.path.splitext(os.path.basename(ui_path))[0]
+    return os.path.join(CACHE_DIR, f"ui_{stem}_{digest}.py")
+
+
+def compile_ui(ui_path):
+    """把 .ui 生成 Python 界面类，并删除同一文件旧版本的生成结果"""
+    from PyQt5 import uic
+    digest = ui_hash(ui_path)
+    target = compiled_path(ui_path, digest)
+    if os.path.exists(target):
+        return target
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(ui_path))[0]
+    for old in glob.glob(os.path.join(CACHE_DIR, f"ui_{stem}_*.py")):
+        os.remove(old)
+    # 先写临时文件再改名，避免中途失败留下半个文件
+    temp = target + ".tmp"
+    with open(ui_path, encoding="utf-8") as source, open(temp, "w", encoding="utf-8") as out:
+        uic.compileUi(source, out)
+    os.replace(temp, target)
+    return target
+
+
+def _load_class(module_path):
+    cls = _classes.get(module_path)
+    if cls is None:
+        name = os.path.splitext(os.path.basename(module_path))[0]
+        spec = importlib.util.spec_from_file_location(name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        cls = next(value for key, value in vars(module).items() if key.startswith("Ui_"))
+        _classes[module_path] = cls
+    return cls
+
+
+def load_ui(ui_path, widget):
+    """与 uic.loadUi(ui_path, widget) 效果相同：控件作为 widget 的属性，返回 widget。
+
+    优先使用缓存中生成好的界面类；缓存缺失时先生成，生成失败才退回 uic.loadUi。
+    """
+    try:
+        module_path = compiled_path(ui_path, ui_hash(ui_path))
+        if not os.path.exists(module_path):
+            module_path = compile_ui(ui_path)
+        ui = _load_class(module_path)()
+        ui.setupUi(widget)
+    except Exception as e:
+        print(f"界面缓存不可用，改为运行时加载：{ui_path} {e}")
+        from PyQt5 import uic
+        return uic.loadUi(ui_path, widget)
+    # uic.loadUi 会把子控件挂到 widget 上，这里保持一致
+    for name, value in vars(ui).items():
+        setattr(widget, name, value)
+    return widget
+
+
+def build_all(ui_dir=UI_DIR):
+    """构建步骤：预先生成所有 .ui 对应的界面类"""
+    for ui_path in sorted(glob.glob(os.path.join(ui_dir, "*.ui"))):
+        print(f"{ui_path} -> {compile_ui(ui_path)}")
+
+
+def benchmark(repeat=20, ui_dir=UI_DIR):
+    """对比 uic.loadUi 与缓存界面类的加载耗时（首次为冷启动，其余取平均）"""
+    from PyQt5.QtWidgets import QApplication, QWidget
+    app = QApplication.instance() or QApplication(sys.argv)
+    start = time.perf_counter()
+    from PyQt5 import uic
+    print(f"import PyQt5.uic: {(time.perf_counter() - start) * 1000:.1f} ms（使用缓存时启动不再需要）")
+    for ui_path in sorted(glob.glob(os.path.join(ui_dir, "*.ui"))):
+        compile_ui(ui_path)
+        for label, load in (("uic.loadUi", uic.loadUi), ("缓存界面类", load_ui)):
+            times = []
+            for _ in range(repeat):
+                widget = QWidget()
+                start = time.perf_counter()
+                load(ui_path, widget)
+                times.append((time.perf_counter() - start) * 1000)
+                widget.deleteLater()
+            print(f"{ui_path} {label}: 首次 {times[0]:.2f} ms，平均 {sum(times[1:]) / max(len(times) - 1, 1):.2f} ms")
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    # python ui_cache.py          生成所有界面类
+    # python ui_cache.py --bench  启动耗时对比
+    if "--bench" in sys.argv:
+        benchmark()
+    else:
+        build_all()
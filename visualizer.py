@@ -0,0 +1,359 @@
+from bisect import bisect_right
+from PyQt5.QtCore import Qt, QObject, QRect, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QLinearGradient, QPainter
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtMultimedia import QAudioDecoder, QAudioProbe, QMediaPlayer
+from pcm_player import buffer_to_array
+
+# 频谱计算需要 numpy（可选依赖：pip install numpy），没有安装时不显示频谱
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FFT_SIZE = 2048
+HOP = FFT_SIZE // 2
+# 每秒最多绘制的帧数
+FPS = 30
+# 显示范围：最低/最高频率（Hz）与动态范围（dB）
+MIN_FREQ = 40
+MAX_FREQ = 16000
+DB_RANGE = 60
+# 解码备用方案只保留播放位置附近的样本：超前解码和往回保留的毫秒数
+DECODE_AHEAD = 2000
+DECODE_BEHIND = 500
+
+
+def buffer_to_mono(buffer):
+    """QAudioBuffer -> 单声道 float32 数组（-1 ~ 1），不支持的格式返回 None"""
+    samples = buffer_to_array(buffer)
+    if samples is None:
+        return None
+    return samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+
+
+class SpectrumRenderer:
+    """计算频带强度并画成图片；只在后台线程中使用"""
+
+    def __init__(self, width, height, bar_width=3, gap=1):
+        self.width = width
+        self.height = height
+        self.bar_width = bar_width
+        self.gap = gap
+        self.bars = max(1, (width + gap) // (bar_width + gap))
+        self.levels = np.zeros(self.bars, np.float32)
+        self.peaks = np.zeros(self.bars, np.float32)
+        self.window = np.hanning(FFT_SIZE).astype(np.float32)
+        self.decay = 0.06  # 每帧下落的高度（占总高度的比例）
+        self.peak_decay = 0.015
+        self.peak_color = QColor("#4C5FD1")
+        self.gradient = None
+        self._edges = None
+        self._edges_rate = None
+
+    def set_colors(self, top, middle, bottom, peak, speed=None):
+        """渐变色柱预先画成一张图，绘制时只需按高度截取"""
+        gradient = QLinearGradient(0, 0, 0, self.height)
+        gradient.setColorAt(0, QColor(top))
+        gradient.setColorAt(0.5, QColor(middle))
+        gradient.setColorAt(1, QColor(bottom))
+        image = QImage(self.bar_width, self.height, QImage.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        painter.fillRect(image.rect(), gradient)
+        painter.end()
+        self.gradient = image
+        self.peak_color = QColor(peak)
+        if speed:
+            self.decay = 0.02 * speed
+
+    def band_edges(self, sample_rate):
+        """对数刻度的频带在 FFT 结果中的起始下标"""
+        if sample_rate != self._edges_rate:
+            top = min(MAX_FREQ, sample_rate / 2)
+            freqs = np.geomspace(MIN_FREQ, top, self.bars + 1)[:-1]
+            edges = np.round(freqs * FFT_SIZE / sample_rate).astype(np.intp)
+            # 低频处多个频带可能落在同一个下标上，依次后移保证严格递增
+            edges[0] = max(edges[0], 1)
+            for i in range(1, len(edges)):
+                if edges[i] <= edges[i - 1]:
+                    edges[i] = edges[i - 1] + 1
+            self._edges = np.minimum(edges, FFT_SIZE // 2)
+            self._edges_rate = sample_rate
+        return self._edges
+
+    def analyze(self, samples, sample_rate):
+        """把一批样本切成重叠的帧，一次性做 FFT，返回各频带 0~1 的强度"""
+        count = (len(samples) - FFT_SIZE) // HOP + 1
+        if count <= 0 or not sample_rate:
+            return None
+        index = np.arange(FFT_SIZE)[None, :] + HOP * np.arange(count)[:, None]
+        spectrum = np.abs(np.fft.rfft(samples[index] * self.window, axis=1)).max(axis=0)
+        bands = np.maximum.reduceat(spectrum, self.band_edges(sample_rate))
+        db = 20 * np.log10(bands / (FFT_SIZE / 4) + 1e-9)
+        return np.clip((db + DB_RANGE) / DB_RANGE, 0, 1).astype(np.float32)
+
+    def step(self, level):
+        """柱子立即升高、缓慢下落，峰值点下落得更慢"""
+        falling = self.levels - self.decay
+        self.levels = falling if level is None else np.maximum(level, falling)
+        np.clip(self.levels, 0, 1, out=self.levels)
+        self.peaks = np.maximum(self.levels, self.peaks - self.peak_decay)
+        return bool(self.peaks.any())
+
+    def render(self):
+        image = QImage(self.width, self.height, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        heights = (self.levels * self.height).astype(np.intp)
+        peaks = (self.peaks * self.height).astype(np.intp)
+        step = self.bar_width + self.gap
+        for bar in range(self.bars):
+            x = bar * step
+            height = int(heights[bar])
+            if height > 0 and self.gradient is not None:
+                top = self.height - height
+                painter.drawImage(QRect(x, top, self.bar_width, height), self.gradient,
+                                  QRect(0, top, self.bar_width, height))
+            peak = int(peaks[bar])
+            if peak > 0:
+                painter.fillRect(x, self.height - peak - 1, self.bar_width, 1, self.peak_color)
+        painter.end()
+        return image
+
+
+class SpectrumSignals(QObject):
+    frame = pyqtSignal(QImage, bool)  # 绘制好的一帧, 是否还有柱子没落下
+
+
+class SpectrumTask(QRunnable):
+    """后台线程中完成一帧的 FFT 和绘制"""
+
+    def __init__(self, renderer, samples, sample_rate, colors):
+        super().__init__()
+        self.renderer = renderer
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.colors = colors
+        self.signals = SpectrumSignals()
+
+    def run(self):
+        renderer = self.renderer
+        if self.colors is not None:
+            renderer.set_colors(*self.colors)
+        level = renderer.analyze(self.samples, self.sample_rate) if self.samples is not None else None
+        active = renderer.step(level)
+        self.signals.frame.emit(renderer.render(), active)
+
+
+class SpectrumWidget(QWidget):
+    """频谱显示：用 QAudioProbe 取得解码后的 PCM；平台不支持时另用 QAudioDecoder 解码当前歌曲，
+    按播放位置取样（只比播放位置超前两秒，解码速度跟着播放走）。FFT 和绘制都在后台线程完成，界面线程只贴图。
+    """
+
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.engine = engine
+        self.image = None
+        self.renderer = None
+        self.colors = ("#71CDFD", "#4C5FD1", "#71CDFD", "#4C5FD1", 3)
+        self._colors_changed = True
+        self._busy = False
+        self._task = None
+        # 独立的单线程池，不与导入、预读任务抢线程
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        # 探针送来的样本（界面线程中追加，定时器取走）
+        self.pending = []
+        self.tail = None  # 上一帧末尾的样本，与新样本拼接后保证帧可以重叠
+        self.sample_rate = 0
+
+        # 解码备用方案：播放位置附近的 [(起始毫秒, 样本)]
+        self.decoder = None
+        self.decoded_path = None
+        self.decoded_end = 0  # 已解码到的位置（毫秒）
+        self.chunk_starts = []
+        self.chunks = []
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // FPS)
+        self.timer.timeout.connect(self._tick)
+
+        if np is None:
+            print("未安装 numpy，不显示频谱（pip install numpy）")
+            return
+        self.probing = False
+        self.probes = []
+        self.attach_players()
+        engine.playersChanged.connect(self.attach_players)
+        engine.stateChanged.connect(self._on_state)
+
+    def attach_players(self):
+        """接入引擎的播放器：QMediaPlayer 用 QAudioProbe 取样本，
+        PcmPlayer（启用均衡器时）直接送出写入声卡的样本，频谱会反映均衡器的效果"""
+        for probe in self.probes:
+            probe.deleteLater()
+        self.probes = []
+        self.pending = []
+        self.tail = None
+        attached = 0
+        for player in self.engine.players:
+            if isinstance(player, QMediaPlayer):
+                probe = QAudioProbe(self)
+                if probe.setSource(player):
+                    probe.audioBufferProbed.connect(lambda buffer, p=player: self._on_probed(p, buffer))
+                    self.probes.append(probe)
+                    attached += 1
+            else:
+                player.samplesPlayed.connect(
+                    lambda samples, rate, p=player: self._on_samples(p, samples.mean(axis=1), rate))
+                attached += 1
+        self.probing = attached == len(self.engine.players)
+
+    def apply_skin(self, layout):
+        """位置取自 Skin.xml 的 visual，颜色取自 Visual.xml"""
+        rect = layout.place('player_window', 'visual')
+        if rect:
+            self.setGeometry(*rect)
+        color = lambda key, default: layout.color('visual', key, default)
+        self.colors = (color('SpectrumTopColor', self.colors[0]), color('SpectrumMidColor', self.colors[1]),
+                       color('SpectrumBtmColor', self.colors[2]), color('SpectrumPeakColor', self.colors[3]),
+                       int(color('BlurSpeed', self.colors[4]) or 3))
+        self._colors_changed = True
+        self.renderer = None
+
+    def resizeEvent(self, event):
+        # 尺寸变化后重新建立绘制器（频带数随宽度变化）
+        self.renderer = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self.image is not None:
+            painter = QPainter(self)
+            painter.drawImage(0, 0, self.image)
+
+    def _on_state(self, state):
+        if state == QMediaPlayer.PlayingState and np is not None:
+            self.timer.start()
+
+    def _on_probed(self, player, buffer):
+        if player is not self.engine.player:
+            return
+        samples = buffer_to_mono(buffer)
+        if samples is not None:
+            self._on_samples(player, samples, buffer.format().sampleRate())
+
+    def _on_samples(self, player, samples, sample_rate):
+        if player is not self.engine.player:
+            return
+        self.sample_rate = sample_rate
+        self.pending.append(samples)
+        # 长时间不取时只保留最近的一段
+        if len(self.pending) > 64:
+            del self.pending[:-32]
+
+    def _take_probed(self):
+        if not self.pending:
+            return None
+        parts = ([self.tail] if self.tail is not None else []) + self.pending
+        self.pending = []
+        samples = np.concatenate(parts)
+        # 积压太多时只分析最近的部分
+        samples = samples[-FFT_SIZE * 8:]
+        self.tail = samples[-(FFT_SIZE - HOP):]
+        return samples
+
+    def _take_decoded(self):
+        """备用方案：按当前播放位置从解码结果中截取一帧"""
+        path = self.engine.player.currentMedia().canonicalUrl().toLocalFile()
+        position = self.engine.position()
+        first = self.chunk_starts[0] if self.chunks else self.decoded_end
+        if path != self.decoded_path or position < first:
+            # 换了歌，或者往回跳到了保留范围之前：QAudioDecoder 不支持跳转，从头重新解码
+            self._decode(path)
+            return None
+        # 丢掉播放位置之前不再需要的部分，再按需继续解码
+        keep = bisect_right(self.chunk_starts, position - DECODE_BEHIND) - 1
+        if keep > 0:
+            del self.chunk_starts[:keep]
+            del self.chunks[:keep]
+        self._fill(position)
+        if not self.chunks or not self.sample_rate:
+            return None
+        index = bisect_right(self.chunk_starts, position) - 1
+        if index < 0:
+            return None
+        parts = self.chunks[max(index - 2, 0):index + 1]
+        samples = np.concatenate(parts)
+        offset = int((position - self.chunk_starts[index]) * self.sample_rate / 1000) \
+            + sum(len(part) for part in parts[:-1])
+        start = max(offset - FFT_SIZE, 0)
+        return samples[start:start + FFT_SIZE] if offset >= FFT_SIZE else None
+
+    def _decode(self, path):
+        if self.decoder is None:
+            self.decoder = QAudioDecoder(self)
+            self.decoder.bufferReady.connect(self._on_decoded)
+        self.decoder.stop()
+        self.decoded_path = path
+        self.decoded_end = 0
+        self.chunk_starts = []
+        self.chunks = []
+        if path:
+            self.decoder.setSourceFilename(path)
+            self.decoder.start()
+
+    def _on_decoded(self):
+        self._fill(self.engine.position())
+
+    def _fill(self, position):
+        """只在解码结果不够超前时才取走缓冲，否则解码器停下来等待"""
+        while self.decoder.bufferAvailable() and self.decoded_end < position + DECODE_AHEAD:
+            self._store(self.decoder.read(), position)
+
+    def _store(self, buffer, position):
+        start = buffer.startTime() // 1000
+        self.decoded_end = start + buffer.duration() // 1000
+        if self.decoded_end < position - DECODE_BEHIND:
+            # 向后跳转时跳过的部分，不必转换
+            return
+        samples = buffer_to_mono(buffer)
+        if samples is None:
+            return
+        self.sample_rate = buffer.format().sampleRate()
+        # 只保存 16 位整数，减小内存占用
+        self.chunk_starts.append(start)
+        self.chunks.append((samples * 32767).astype(np.int16))
+
+    def _tick(self):
+        if self._busy or not self.isVisible():
+            return
+        playing = self.engine.state() == QMediaPlayer.PlayingState
+        samples = None
+        if playing:
+            samples = self._take_probed() if self.probing else self._take_decoded()
+            if samples is not None and samples.dtype != np.float32:
+                samples = samples.astype(np.float32) / 32768
+        if self.renderer is None:
+            if self.width() <= 0 or self.height() <= 0:
+                return
+            self.renderer = SpectrumRenderer(self.width(), self.height())
+            self._colors_changed = True
+        colors = self.colors if self._colors_changed else None
+        self._colors_changed = False
+        self._busy = True
+        self._task = SpectrumTask(self.renderer, samples, self.sample_rate, colors)
+        self._task.signals.frame.connect(self._on_frame)
+        self.pool.start(self._task)
+
+    def _on_frame(self, image, active):
+        self._busy = False
+        self._task = None
+        self.image = image
+        self.update()
+        # 暂停后等柱子全部落下再停止定时器，不再占用 CPU
+        if not active and self.engine.state() != QMediaPlayer.PlayingState:
+            self.timer.stop()
+            self.pending = []
+            self.tail = None